@@ -12,14 +12,60 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-import plotly.express as px
 from plotly.subplots import make_subplots
 from risk_calculator_maritime import RiskCalculator_Maritime
 import json
+import os
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    import orjson
+except ImportError:  # Optional: faster report serialization
+    orjson = None
+
+# Above this many vessels, comparison charts switch from SVG bars to WebGL markers
+WEBGL_VESSEL_THRESHOLD = 30
+
+# Maximum vessels plotted in a comparison chart; the rest are dropped by smallest change
+COMPARISON_MAX_VESSELS = 200
+
+# Display lookups shared by the chart, vessel and recommendation renderers
+RISK_COLORS = {
+    'LOW': '#28a745',
+    'MEDIUM': '#ffc107',
+    'HIGH': '#fd7e14',
+    'CRITICAL': '#dc3545'
+}
+
+RISK_COLOR_CLASS = {
+    'LOW': 'risk-low',
+    'MEDIUM': 'risk-medium',
+    'HIGH': 'risk-high',
+    'CRITICAL': 'risk-critical'
+}
+
+PRIORITY_CLASS = {
+    'CRITICAL': 'critical-alert',
+    'HIGH': 'recommendation-card',
+    'MEDIUM': 'recommendation-card'
+}
+
+PRIORITY_ICON = {
+    'CRITICAL': '🚨',
+    'HIGH': '⚠️',
+    'MEDIUM': '📋'
+}
+
+FLEET_RECOMMENDATION_TEMPLATE = (
+    '<div class="{cls}">'
+    '<strong>🎯 {action}</strong><br>'
+    'Category: {category} | Priority: {priority}<br>'
+    'Impact: {impact} | Timeframe: {timeframe}'
+    '</div>'
+)
+
 # Page configuration
 st.set_page_config(
     page_title="Maritime Risk Assessment Dashboard",
@@ -29,7 +75,7 @@ st.set_page_config(
 )
 
 # Custom CSS for professional styling
-st.markdown("""
+CSS_BLOCK = """
 <style>
 .main-header {
     background: linear-gradient(90deg, #1e3c72 0%, #2a5298 100%);
@@ -71,29 +117,101 @@ st.markdown("""
     margin: 1rem 0;
 }
 </style>
-""", unsafe_allow_html=True)
+"""
 
-@st.cache_data
-def load_risk_calculator():
-    """Load and cache the risk calculator."""
+# Re-emitted on every full rerun: Streamlit drops elements a rerun does not produce
+st.markdown(CSS_BLOCK, unsafe_allow_html=True)
+
+@st.cache_resource(max_entries=1)
+def load_risk_calculator(data_version):
+    """
+    Load the risk calculator once per data version and share the instance across reruns and sessions.
+    A new data_version rebuilds it, so its score memo and loaded data never outlive the source files.
+    """
     try:
         calculator = RiskCalculator_Maritime()
+        # Data loads lazily; load it here so a missing data file is reported now
+        calculator.vessel_data
         return calculator
     except Exception as e:
         st.error(f"Error loading risk calculator: {str(e)}")
         return None
 
+def get_data_version(data_path="processed_data"):
+    """Fingerprint the calculator's source files so the calculator and cached results refresh when they change."""
+    source_files = [
+        os.path.join(data_path, "core_master", "vessel_master.json"),
+        os.path.join(data_path, "analytics", "inspection_fact.json")
+    ]
+    try:
+        return "|".join(str(os.path.getmtime(path)) for path in source_files)
+    except OSError:
+        return "unavailable"
+
+@st.cache_data(show_spinner=False)
+def _cached_fleet_report(data_version):
+    """Generate and cache the fleet report; its top_risk_vessels already holds the top 5, highest first."""
+    return load_risk_calculator(data_version).generateFleetReport()
+
+@st.cache_data(show_spinner=False)
+def _vessel_names(data_version):
+    """Cache the names of vessels with inspection data for a given data version."""
+    calculator = load_risk_calculator(data_version)
+    return tuple(v['vessel_name'] for v in calculator.inspection_data['vessel_performance'])
+
+@st.cache_data(show_spinner=False)
+def _age_by_vessel(data_version):
+    """Cache a vessel name -> age (years) lookup for a given data version."""
+    calculator = load_risk_calculator(data_version)
+    return {v['vessel_name']: v.get('age_years', 0) for v in calculator.vessel_data['vessels']}
+
+@st.cache_data(show_spinner=False)
+def _aged_vessel_names(data_version, min_age=25):
+    """Cache the inspected vessels older than min_age years for a given data version."""
+    age_by_vessel = _age_by_vessel(data_version)
+    return [v for v in _vessel_names(data_version) if age_by_vessel.get(v, 0) > min_age]
+
+@st.cache_data(show_spinner=False)
+def _cached_assessment(vessel_name, data_version):
+    """Assess and cache a single vessel's risk profile for a given data version."""
+    return load_risk_calculator(data_version).assessVesselRisk(vessel_name)
+
+@st.cache_data(show_spinner=False)
+def _cached_matrix_pair(data_version):
+    """Generate the fleet risk matrix once and cache it with its heatmap for a given data version."""
+    calculator = load_risk_calculator(data_version)
+    risk_matrix = calculator.generateRiskMatrix()
+    # visualizeRiskMatrix reuses the matrix stored by generateRiskMatrix above
+    matrix_fig = calculator.visualizeRiskMatrix()
+    return risk_matrix, matrix_fig
+
+@st.cache_data(show_spinner=False)
+def _report_json_bytes(data_version):
+    """Serialize the cached fleet report to JSON bytes for download."""
+    report = _cached_fleet_report(data_version)
+    if orjson is not None:
+        return orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(report, indent=2).encode()
+
+@st.cache_data(show_spinner=False)
+def _report_csv_bytes(data_version):
+    """Serialize the cached vessel details to CSV bytes for download."""
+    vessel_df = pd.DataFrame(_cached_fleet_report(data_version)['vessel_details'])
+    return vessel_df.to_csv(index=False).encode()
+
+def _to_arrow_backed(df):
+    """Convert to pyarrow-backed dtypes, when available, so st.dataframe skips per-column conversion."""
+    try:
+        return df.convert_dtypes(dtype_backend='pyarrow')
+    except (ImportError, TypeError):
+        return df
+
 def format_risk_category(category, score):
     """Format risk category with appropriate color coding."""
-    color_map = {
-        'LOW': 'risk-low',
-        'MEDIUM': 'risk-medium', 
-        'HIGH': 'risk-high',
-        'CRITICAL': 'risk-critical'
-    }
-    color_class = color_map.get(category, '')
+    color_class = RISK_COLOR_CLASS.get(category, '')
     return f'<span class="{color_class}">{category} ({score})</span>'
 
+@st.cache_data(show_spinner=False)
 def create_risk_gauge(score, title="Risk Score"):
     """Create a risk gauge visualization."""
     fig = go.Figure(go.Indicator(
@@ -124,8 +242,16 @@ def create_risk_gauge(score, title="Risk Score"):
 
 def create_factor_breakdown_chart(factors):
     """Create factor breakdown visualization."""
+    return _factor_breakdown_figure((factors['age_factor'], factors['history_factor'], factors['mou_factor']))
+
+@st.cache_data(show_spinner=False)
+def _factor_breakdown_figure(factor_values):
+    """
+    Build and cache the factor breakdown bar chart for (age, history, MOU) scores.
+    
+    Always three bars, well below WEBGL_VESSEL_THRESHOLD, so SVG rendering is kept.
+    """
     factor_names = ['Age Factor', 'History Factor', 'MOU Factor']
-    factor_values = [factors['age_factor'], factors['history_factor'], factors['mou_factor']]
     weights = [0.4, 0.4, 0.2]
     
     fig = go.Figure()
@@ -134,7 +260,7 @@ def create_factor_breakdown_chart(factors):
     fig.add_trace(go.Bar(
         name='Risk Factors',
         x=factor_names,
-        y=factor_values,
+        y=list(factor_values),
         marker_color=['#ff6b6b', '#4ecdc4', '#45b7d1'],
         text=[f'{v:.1f}<br>(Weight: {w})' for v, w in zip(factor_values, weights)],
         textposition='auto'
@@ -150,6 +276,234 @@ def create_factor_breakdown_chart(factors):
     
     return fig
 
+@st.cache_data(show_spinner=False)
+def _build_pie(risk_items):
+    """Build and cache the fleet risk distribution pie chart."""
+    labels = [category for category, _ in risk_items]
+    fig = go.Figure(go.Pie(
+        labels=labels,
+        values=[count for _, count in risk_items],
+        marker_colors=[RISK_COLORS.get(label) for label in labels]
+    ))
+    fig.update_layout(title="Fleet Risk Distribution")
+    return fig
+
+def _largest_changes(vessel_names, baseline_scores, modified_scores, limit=COMPARISON_MAX_VESSELS):
+    """Keep the vessels with the largest baseline/projected difference, in their original order."""
+    if len(vessel_names) <= limit:
+        return vessel_names, baseline_scores, modified_scores
+    
+    change = np.abs(baseline_scores - modified_scores)
+    keep = np.sort(np.argsort(-change, kind='stable')[:limit])
+    return vessel_names[keep], baseline_scores[keep], modified_scores[keep]
+
+@st.cache_data(show_spinner=False)
+def _build_comparison(vessel_names, baseline_scores, modified_scores, scenario_type):
+    """Build and cache the current vs projected risk comparison chart."""
+    fig = go.Figure()
+    
+    if len(vessel_names) > WEBGL_VESSEL_THRESHOLD:
+        # Large selections render through WebGL; SVG bars scale poorly with many vessels
+        fig.add_trace(go.Scattergl(
+            name='Current Risk',
+            x=list(vessel_names),
+            y=baseline_scores,
+            mode='markers',
+            marker=dict(symbol='square', color='#ff6b6b')
+        ))
+        
+        fig.add_trace(go.Scattergl(
+            name='Projected Risk',
+            x=list(vessel_names),
+            y=modified_scores,
+            mode='markers',
+            marker=dict(symbol='square', color='#4ecdc4')
+        ))
+    else:
+        fig.add_trace(go.Bar(
+            name='Current Risk',
+            x=list(vessel_names),
+            y=baseline_scores,
+            marker_color='#ff6b6b'
+        ))
+        
+        fig.add_trace(go.Bar(
+            name='Projected Risk',
+            x=list(vessel_names),
+            y=modified_scores,
+            marker_color='#4ecdc4'
+        ))
+    
+    fig.update_layout(
+        title=f'Risk Reduction Impact - {scenario_type.replace("_", " ").title()}',
+        xaxis_title='Vessels',
+        yaxis_title='Risk Score',
+        barmode='group',
+        height=500
+    )
+    
+    return fig
+
+@st.fragment
+def _scenario_fragment(calculator, scenario_type, data_version):
+    """Render scenario parameters and results; widget changes here rerun only this fragment."""
+    # Get vessels for simulation
+    vessels_available = _vessel_names(data_version)
+    
+    # Scenario parameters
+    st.subheader("Scenario Parameters")
+    
+    if scenario_type == "training_impact":
+        st.markdown("**Training Impact Scenario:** Model the effect of crew training on deficiency reduction")
+        
+        defect_reduction = st.slider(
+            "Expected Deficiency Reduction (%)",
+            min_value=5,
+            max_value=50,
+            value=25,
+            step=5
+        )
+        
+        selected_vessels = st.multiselect(
+            "Select Vessels for Analysis:",
+            vessels_available,
+            default=list(vessels_available[:3])
+        )
+        
+        parameters = {
+            'defect_reduction': defect_reduction,
+            'vessels': selected_vessels
+        }
+        
+    elif scenario_type == "maintenance_improvement":
+        st.markdown("**Maintenance Improvement Scenario:** Model enhanced maintenance programs")
+        
+        age_risk_reduction = st.slider(
+            "Age-Related Risk Reduction (%)",
+            min_value=5,
+            max_value=30,
+            value=15,
+            step=5
+        )
+        
+        aged_vessels = _aged_vessel_names(data_version)
+        
+        selected_vessels = st.multiselect(
+            "Select Vessels for Analysis:",
+            vessels_available,
+            default=aged_vessels[:3]
+        )
+        
+        parameters = {
+            'age_risk_reduction': age_risk_reduction,
+            'vessels': selected_vessels
+        }
+    
+    # Run simulation
+    if st.button("🚀 Run Scenario Simulation"):
+        if selected_vessels:
+            try:
+                with st.spinner("Running scenario simulation..."):
+                    results = calculator.simulateScenario(scenario_type, parameters)
+                
+                if 'error' not in results:
+                    # Display results
+                    st.success("✅ Scenario simulation completed!")
+                    
+                    # Summary metrics
+                    summary = results['summary']
+                    
+                    col1, col2, col3, col4 = st.columns(4)
+                    
+                    with col1:
+                        st.metric(
+                            "Vessels Improved",
+                            summary['vessels_improved'],
+                            delta=f"{summary['improvement_rate_pct']:.1f}%"
+                        )
+                    
+                    with col2:
+                        st.metric(
+                            "Average Risk Reduction",
+                            f"{summary['average_risk_reduction']:.1f}",
+                            delta="Lower is better"
+                        )
+                    
+                    with col3:
+                        st.metric(
+                            "Annual Savings",
+                            f"${summary['roi_estimate']['annual_savings']:,}",
+                            delta=None
+                        )
+                    
+                    with col4:
+                        st.metric(
+                            "ROI (5-year)",
+                            f"{summary['roi_estimate']['roi_5_year_pct']:.1f}%",
+                            delta=None
+                        )
+                    
+                    # Detailed vessel analysis
+                    st.subheader("📊 Detailed Vessel Impact Analysis")
+                    
+                    vessels_analyzed = results['vessels_analyzed']
+                    df_results = pd.DataFrame({
+                        'Vessel': [v['vessel_name'] for v in vessels_analyzed],
+                        'Current Risk': [v['baseline_score'] for v in vessels_analyzed],
+                        'Projected Risk': [v['modified_score'] for v in vessels_analyzed],
+                        'Risk Reduction': [v['risk_reduction'] for v in vessels_analyzed],
+                        'Current Category': [v['baseline_category'] for v in vessels_analyzed],
+                        'Projected Category': [v['modified_category'] for v in vessels_analyzed]
+                    })
+                    df_results = df_results.sort_values('Risk Reduction', ascending=False)
+                    df_results = _to_arrow_backed(df_results)
+                    st.dataframe(df_results, use_container_width=True)
+                    
+                    # ROI Analysis
+                    st.subheader("💰 Return on Investment Analysis")
+                    roi_data = summary['roi_estimate']
+                    
+                    st.markdown(f"""
+                    - **Estimated Implementation Cost:** ${roi_data['estimated_cost']:,}
+                    - **Annual Risk Savings:** ${roi_data['annual_savings']:,}
+                    - **Payback Period:** {roi_data['payback_period_years']:.1f} years
+                    - **5-Year ROI:** {roi_data['roi_5_year_pct']:.1f}%
+                    """)
+                    
+                    # Visualization
+                    vessel_count = len(vessels_analyzed)
+                    vessel_names = np.empty(vessel_count, dtype=object)
+                    baseline_scores = np.empty(vessel_count)
+                    modified_scores = np.empty(vessel_count)
+                    for i, v in enumerate(vessels_analyzed):
+                        vessel_names[i] = v['vessel_name']
+                        baseline_scores[i] = v['baseline_score']
+                        modified_scores[i] = v['modified_score']
+                    
+                    if len(vessel_names) > COMPARISON_MAX_VESSELS:
+                        vessel_names, baseline_scores, modified_scores = _largest_changes(
+                            vessel_names, baseline_scores, modified_scores
+                        )
+                        st.caption(f"Showing the {COMPARISON_MAX_VESSELS} vessels with the largest projected change.")
+                    
+                    # Names go in as a tuple: object arrays do not hash by value for st.cache_data
+                    fig = _build_comparison(
+                        tuple(vessel_names),
+                        baseline_scores,
+                        modified_scores,
+                        scenario_type
+                    )
+                    
+                    st.plotly_chart(fig, use_container_width=True)
+                    
+                else:
+                    st.error(f"Scenario simulation failed: {results['error']}")
+                    
+            except Exception as e:
+                st.error(f"Error running scenario simulation: {str(e)}")
+        else:
+            st.warning("Please select at least one vessel for analysis.")
+
 def main():
     """Main dashboard application."""
     
@@ -161,8 +515,9 @@ def main():
     </div>
     """, unsafe_allow_html=True)
     
-    # Load risk calculator
-    calculator = load_risk_calculator()
+    # Load risk calculator for the current data files
+    data_version = get_data_version()
+    calculator = load_risk_calculator(data_version)
     if not calculator:
         st.error("Failed to load risk assessment system. Please check data files.")
         return
@@ -180,9 +535,14 @@ def main():
         
         # Generate fleet metrics
         try:
-            fleet_report = calculator.generateFleetReport()
+            fleet_report = _cached_fleet_report(data_version)
             fleet_overview = fleet_report['fleet_overview']
             
+            # Share of fleet at high/critical risk (guarded for an empty fleet)
+            total_vessels = max(fleet_overview['total_vessels'], 1)
+            high_risk_pct = fleet_overview['high_risk_vessels'] * 100.0 / total_vessels
+            critical_risk_pct = fleet_overview['critical_risk_vessels'] * 100.0 / total_vessels
+            
             # Key metrics in columns
             col1, col2, col3, col4 = st.columns(4)
             
@@ -204,14 +564,14 @@ def main():
                 st.metric(
                     label="High Risk Vessels",
                     value=fleet_overview['high_risk_vessels'],
-                    delta=f"{(fleet_overview['high_risk_vessels']/fleet_overview['total_vessels']*100):.1f}%"
+                    delta=f"{high_risk_pct:.1f}%"
                 )
                 
             with col4:
                 st.metric(
                     label="Critical Risk Vessels",
                     value=fleet_overview['critical_risk_vessels'],
-                    delta=f"{(fleet_overview['critical_risk_vessels']/fleet_overview['total_vessels']*100):.1f}%"
+                    delta=f"{critical_risk_pct:.1f}%"
                 )
             
             # Risk distribution chart
@@ -221,55 +581,30 @@ def main():
             
             with col1:
                 # Risk distribution pie chart
-                fig_pie = px.pie(
-                    values=list(risk_dist.values()),
-                    names=list(risk_dist.keys()),
-                    title="Fleet Risk Distribution",
-                    color_discrete_map={
-                        'LOW': '#28a745',
-                        'MEDIUM': '#ffc107', 
-                        'HIGH': '#fd7e14',
-                        'CRITICAL': '#dc3545'
-                    }
-                )
+                fig_pie = _build_pie(tuple(risk_dist.items()))
                 st.plotly_chart(fig_pie, use_container_width=True)
             
             with col2:
                 # Top risk vessels
                 st.subheader("🚨 Top Risk Vessels")
-                for vessel in fleet_report['top_risk_vessels'][:5]:
-                    risk_color = {
-                        'LOW': 'risk-low',
-                        'MEDIUM': 'risk-medium',
-                        'HIGH': 'risk-high', 
-                        'CRITICAL': 'risk-critical'
-                    }.get(vessel['risk_category'], '')
-                    
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <strong>{vessel['vessel_name']}</strong><br>
-                        Risk Score: <span class="{risk_color}">{vessel['risk_score']:.1f}</span><br>
-                        Primary Factor: {vessel['primary_risk_factor']}
-                    </div>
-                    """, unsafe_allow_html=True)
+                vessel_cards = "".join(
+                    f'<div class="metric-card">'
+                    f'<strong>{vessel["vessel_name"]}</strong><br>'
+                    f'Risk Score: <span class="{RISK_COLOR_CLASS.get(vessel["risk_category"], "")}">{vessel["risk_score"]:.1f}</span><br>'
+                    f'Primary Factor: {vessel["primary_risk_factor"]}'
+                    f'</div>'
+                    for vessel in fleet_report['top_risk_vessels']
+                )
+                st.markdown(vessel_cards, unsafe_allow_html=True)
             
             # Fleet recommendations
             if fleet_report['fleet_recommendations']:
                 st.subheader("📋 Fleet-Level Recommendations")
-                for rec in fleet_report['fleet_recommendations']:
-                    priority_color = {
-                        'CRITICAL': 'critical-alert',
-                        'HIGH': 'recommendation-card',
-                        'MEDIUM': 'recommendation-card'
-                    }.get(rec['priority'], 'recommendation-card')
-                    
-                    st.markdown(f"""
-                    <div class="{priority_color}">
-                        <strong>🎯 {rec['action']}</strong><br>
-                        Category: {rec['category']} | Priority: {rec['priority']}<br>
-                        Impact: {rec['impact']} | Timeframe: {rec['timeframe']}
-                    </div>
-                    """, unsafe_allow_html=True)
+                recommendation_cards = "".join(
+                    FLEET_RECOMMENDATION_TEMPLATE.format_map({**rec, 'cls': PRIORITY_CLASS.get(rec['priority'], 'recommendation-card')})
+                    for rec in fleet_report['fleet_recommendations']
+                )
+                st.markdown(recommendation_cards, unsafe_allow_html=True)
                     
         except Exception as e:
             st.error(f"Error generating fleet overview: {str(e)}")
@@ -279,7 +614,7 @@ def main():
         st.header("🔍 Individual Vessel Risk Assessment")
         
         # Get list of vessels with inspection data
-        vessels_with_data = [v['vessel_name'] for v in calculator.inspection_data['vessel_performance']]
+        vessels_with_data = _vessel_names(data_version)
         
         selected_vessel = st.selectbox(
             "Select Vessel for Assessment:",
@@ -290,7 +625,7 @@ def main():
         if selected_vessel:
             try:
                 # Get comprehensive vessel assessment
-                assessment = calculator.assessVesselRisk(selected_vessel)
+                assessment = _cached_assessment(selected_vessel, data_version)
                 
                 if 'error' not in assessment:
                     # Main risk score display
@@ -351,14 +686,11 @@ def main():
                     with col2:
                         # Recommendations
                         st.subheader("💡 Risk Mitigation Recommendations")
+                        recommendation_blocks = []
                         for rec in assessment['recommendations']:
-                            priority_icon = {
-                                'CRITICAL': '🚨',
-                                'HIGH': '⚠️',
-                                'MEDIUM': '📋'
-                            }.get(rec['priority'], '📝')
+                            priority_icon = PRIORITY_ICON.get(rec['priority'], '📝')
                             
-                            st.markdown(f"""
+                            recommendation_blocks.append(f"""
                             **{priority_icon} {rec['action']}**  
                             *{rec['category']} - {rec['priority']} Priority*  
                             
@@ -369,6 +701,9 @@ def main():
                             
                             ---
                             """)
+                        
+                        if recommendation_blocks:
+                            st.markdown("".join(recommendation_blocks))
                 
                 else:
                     st.error(f"Error assessing vessel: {assessment['error']}")
@@ -382,12 +717,15 @@ def main():
         
         try:
             # Generate risk matrix
-            risk_matrix = calculator.generateRiskMatrix()
-            matrix_fig = calculator.visualizeRiskMatrix()
+            risk_matrix, matrix_fig = _cached_matrix_pair(data_version)
             
             # Display interactive risk matrix
             st.plotly_chart(matrix_fig, use_container_width=True)
             
+            risk_levels = np.asarray(risk_matrix['risk_levels'])
+            vessel_counts = np.asarray(risk_matrix['matrix'])
+            high_risk_mask = risk_levels > 15
+            
             # Matrix summary
             col1, col2, col3 = st.columns(3)
             
@@ -398,44 +736,40 @@ def main():
                 )
             
             with col2:
-                high_risk_cells = sum(1 for i in range(5) for j in range(5) if risk_matrix['risk_levels'][i][j] > 15)
+                high_risk_cells = int(high_risk_mask.sum())
                 st.metric(
                     "High Risk Cells (>15)",
                     high_risk_cells
                 )
             
             with col3:
-                vessels_high_risk = sum(risk_matrix['matrix'][i][j] for i in range(5) for j in range(5) if risk_matrix['risk_levels'][i][j] > 15)
+                vessels_high_risk = int(vessel_counts[high_risk_mask].sum())
                 st.metric(
                     "Vessels in High Risk Cells",
-                    int(vessels_high_risk)
+                    vessels_high_risk
                 )
             
             # Detailed cell analysis
             st.subheader("📊 Risk Cell Analysis")
             
-            # Create detailed matrix table
-            matrix_data = []
-            for i in range(5):
-                for j in range(5):
-                    severity = risk_matrix['severity_levels'][i]
-                    probability = risk_matrix['probability_levels'][j]
-                    risk_level = risk_matrix['risk_levels'][i][j]
-                    vessel_count = int(risk_matrix['matrix'][i][j])
-                    vessels = risk_matrix['vessel_distribution'].get((i, j), [])
-                    
-                    if vessel_count > 0:
-                        matrix_data.append({
-                            'Severity': severity,
-                            'Probability': probability,
-                            'Risk Level': risk_level,
-                            'Vessel Count': vessel_count,
-                            'Vessels': ', '.join(vessels) if len(vessels) <= 3 else f"{', '.join(vessels[:3])} (+{len(vessels)-3} more)"
-                        })
+            # Create detailed matrix table from occupied cells only
+            occupied_cells = np.argwhere(vessel_counts > 0)
+            rows, cols = occupied_cells[:, 0], occupied_cells[:, 1]
+            vessels_col = []
+            for i, j in occupied_cells.tolist():
+                vessels = risk_matrix['vessel_distribution'].get((i, j), [])
+                vessels_col.append(', '.join(vessels) if len(vessels) <= 3 else f"{', '.join(vessels[:3])} (+{len(vessels)-3} more)")
             
-            if matrix_data:
-                df_matrix = pd.DataFrame(matrix_data)
+            if len(occupied_cells):
+                df_matrix = pd.DataFrame({
+                    'Severity': np.take(risk_matrix['severity_levels'], rows),
+                    'Probability': np.take(risk_matrix['probability_levels'], cols),
+                    'Risk Level': risk_levels[rows, cols],
+                    'Vessel Count': vessel_counts[rows, cols].astype(int),
+                    'Vessels': vessels_col
+                })
                 df_matrix = df_matrix.sort_values('Risk Level', ascending=False)
+                df_matrix = _to_arrow_backed(df_matrix)
                 st.dataframe(df_matrix, use_container_width=True)
                 
         except Exception as e:
@@ -451,167 +785,7 @@ def main():
             ["training_impact", "maintenance_improvement", "flag_change"]
         )
         
-        # Get vessels for simulation
-        vessels_available = [v['vessel_name'] for v in calculator.inspection_data['vessel_performance']]
-        
-        # Scenario parameters
-        st.subheader("Scenario Parameters")
-        
-        if scenario_type == "training_impact":
-            st.markdown("**Training Impact Scenario:** Model the effect of crew training on deficiency reduction")
-            
-            defect_reduction = st.slider(
-                "Expected Deficiency Reduction (%)",
-                min_value=5,
-                max_value=50,
-                value=25,
-                step=5
-            )
-            
-            selected_vessels = st.multiselect(
-                "Select Vessels for Analysis:",
-                vessels_available,
-                default=vessels_available[:3]
-            )
-            
-            parameters = {
-                'defect_reduction': defect_reduction,
-                'vessels': selected_vessels
-            }
-            
-        elif scenario_type == "maintenance_improvement":
-            st.markdown("**Maintenance Improvement Scenario:** Model enhanced maintenance programs")
-            
-            age_risk_reduction = st.slider(
-                "Age-Related Risk Reduction (%)",
-                min_value=5,
-                max_value=30,
-                value=15,
-                step=5
-            )
-            
-            selected_vessels = st.multiselect(
-                "Select Vessels for Analysis:",
-                vessels_available,
-                default=[v for v in vessels_available if any(vessel['vessel_name'] == v and vessel.get('age_years', 0) > 25 for vessel in calculator.vessel_data['vessels'])][:3]
-            )
-            
-            parameters = {
-                'age_risk_reduction': age_risk_reduction,
-                'vessels': selected_vessels
-            }
-        
-        # Run simulation
-        if st.button("🚀 Run Scenario Simulation"):
-            if selected_vessels:
-                try:
-                    with st.spinner("Running scenario simulation..."):
-                        results = calculator.simulateScenario(scenario_type, parameters)
-                    
-                    if 'error' not in results:
-                        # Display results
-                        st.success("✅ Scenario simulation completed!")
-                        
-                        # Summary metrics
-                        summary = results['summary']
-                        
-                        col1, col2, col3, col4 = st.columns(4)
-                        
-                        with col1:
-                            st.metric(
-                                "Vessels Improved",
-                                summary['vessels_improved'],
-                                delta=f"{summary['improvement_rate_pct']:.1f}%"
-                            )
-                        
-                        with col2:
-                            st.metric(
-                                "Average Risk Reduction",
-                                f"{summary['average_risk_reduction']:.1f}",
-                                delta="Lower is better"
-                            )
-                        
-                        with col3:
-                            st.metric(
-                                "Annual Savings",
-                                f"${summary['roi_estimate']['annual_savings']:,}",
-                                delta=None
-                            )
-                        
-                        with col4:
-                            st.metric(
-                                "ROI (5-year)",
-                                f"{summary['roi_estimate']['roi_5_year_pct']:.1f}%",
-                                delta=None
-                            )
-                        
-                        # Detailed vessel analysis
-                        st.subheader("📊 Detailed Vessel Impact Analysis")
-                        
-                        vessel_results = []
-                        for vessel_analysis in results['vessels_analyzed']:
-                            vessel_results.append({
-                                'Vessel': vessel_analysis['vessel_name'],
-                                'Current Risk': vessel_analysis['baseline_score'],
-                                'Projected Risk': vessel_analysis['modified_score'],
-                                'Risk Reduction': vessel_analysis['risk_reduction'],
-                                'Current Category': vessel_analysis['baseline_category'],
-                                'Projected Category': vessel_analysis['modified_category']
-                            })
-                        
-                        df_results = pd.DataFrame(vessel_results)
-                        df_results = df_results.sort_values('Risk Reduction', ascending=False)
-                        st.dataframe(df_results, use_container_width=True)
-                        
-                        # ROI Analysis
-                        st.subheader("💰 Return on Investment Analysis")
-                        roi_data = summary['roi_estimate']
-                        
-                        st.markdown(f"""
-                        - **Estimated Implementation Cost:** ${roi_data['estimated_cost']:,}
-                        - **Annual Risk Savings:** ${roi_data['annual_savings']:,}
-                        - **Payback Period:** {roi_data['payback_period_years']:.1f} years
-                        - **5-Year ROI:** {roi_data['roi_5_year_pct']:.1f}%
-                        """)
-                        
-                        # Visualization
-                        vessel_names = [v['vessel_name'] for v in results['vessels_analyzed']]
-                        baseline_scores = [v['baseline_score'] for v in results['vessels_analyzed']]
-                        modified_scores = [v['modified_score'] for v in results['vessels_analyzed']]
-                        
-                        fig = go.Figure()
-                        
-                        fig.add_trace(go.Bar(
-                            name='Current Risk',
-                            x=vessel_names,
-                            y=baseline_scores,
-                            marker_color='#ff6b6b'
-                        ))
-                        
-                        fig.add_trace(go.Bar(
-                            name='Projected Risk',
-                            x=vessel_names,
-                            y=modified_scores,
-                            marker_color='#4ecdc4'
-                        ))
-                        
-                        fig.update_layout(
-                            title=f'Risk Reduction Impact - {scenario_type.replace("_", " ").title()}',
-                            xaxis_title='Vessels',
-                            yaxis_title='Risk Score',
-                            barmode='group',
-                            height=500
-                        )
-                        
-                        st.plotly_chart(fig, use_container_width=True)
-                        
-                    else:
-                        st.error(f"Scenario simulation failed: {results['error']}")
-                        
-                except Exception as e:
-                    st.error(f"Error running scenario simulation: {str(e)}")
-            else:
-                st.warning("Please select at least one vessel for analysis.")
+        _scenario_fragment(calculator, scenario_type, data_version)
     
     # Fleet Reports Page
     elif page == "Fleet Reports":
@@ -620,7 +794,7 @@ def main():
         if st.button("📊 Generate Complete Fleet Risk Report"):
             try:
                 with st.spinner("Generating comprehensive fleet risk report..."):
-                    report = calculator.generateFleetReport()
+                    report = _cached_fleet_report(data_version)
                 
                 st.success("✅ Fleet report generated successfully!")
                 
@@ -629,21 +803,18 @@ def main():
                 
                 with col1:
                     # JSON download
-                    json_data = json.dumps(report, indent=2)
                     st.download_button(
                         label="📥 Download JSON Report",
-                        data=json_data,
+                        data=_report_json_bytes(data_version),
                         file_name=f"fleet_risk_report_{datetime.now().strftime('%Y%m%d_%H%M')}.json",
                         mime="application/json"
                     )
                 
                 with col2:
                     # CSV download for vessel details
-                    vessel_df = pd.DataFrame(report['vessel_details'])
-                    csv_data = vessel_df.to_csv(index=False)
                     st.download_button(
                         label="📥 Download CSV Data",
-                        data=csv_data,
+                        data=_report_csv_bytes(data_version),
                         file_name=f"vessel_risk_data_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
                         mime="text/csv"
                     )
@@ -4,19 +4,119 @@ Core risk calculation functionality without Unicode characters
 """
 
 import json
+import sys
 import numpy as np
+from dataclasses import dataclass
+from io import StringIO
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 
+try:
+    import orjson
+except ImportError:  # Optional: faster JSON load and report writes
+    orjson = None
+
+from risk_kernels import score_batch, _NUMBA_AVAILABLE
+
+# Flag state risk modifiers
+_FLAG_MOD = {
+    'Panama': 1.1,      # Higher risk due to flag of convenience
+    'Marshall Islands': 1.1,
+    'Korea': 0.9,       # Lower risk, good maritime administration
+    'Japan': 0.8,
+    'Norway': 0.8
+}
+
+# Vessel type risk modifiers
+_TYPE_MOD = {
+    'PC(T)C': 1.0,      # Standard risk
+    'Bulk': 0.9,        # Slightly lower risk based on fleet data
+    'Container': 0.85,
+    'Tanker': 1.2
+}
+
+# Classification society modifiers
+_CLASS_MOD = {
+    'DNV': 0.9,         # Lower risk, good class society
+    'RINA': 1.0,
+    'KR': 0.9,          # Korean Register, good reputation
+    'ABS': 0.9,
+    'LR': 0.9
+}
+
+# Performance trend modifiers, looked up by integer trend code
+_TREND_CODES = {
+    'Excellent': 0,
+    'Improving': 1,
+    'Stable': 2,
+    'Deteriorating': 3,
+    'Critical': 4
+}
+_TREND_LUT = np.array([0.7, 0.8, 1.0, 1.3, 1.5])
+
+# Parts of inspection_fact.json the calculator reads; everything else is dropped after parsing
+_INSPECTION_SECTIONS = ('fleet_kpis', 'compliance_kpis')
+_PERF_FIELDS = ('vessel_name', 'inspections', 'avg_deficiencies', 'detention_rate', 'clean_rate', 'performance_trend')
+
+# Risk categories by code; upper bounds are inclusive (<=25 LOW, <=50 MEDIUM, <=75 HIGH)
+_RISK_CATEGORIES = ('LOW', 'MEDIUM', 'HIGH', 'CRITICAL')
+_CATEGORY_BOUNDS = np.array([25, 50, 75])
+
+@dataclass(slots=True)
+class RiskResult:
+    """Flat risk result for one vessel; to_dict() gives the calculateRiskScore shape."""
+    vessel_name: str
+    risk_score: float
+    risk_category: str
+    age_factor: float
+    history_factor: float
+    mou_factor: float
+    age_years: float
+    vessel_type: str
+    flag_state: str
+    built_year: int
+    dwt: float
+    
+    def to_dict(self) -> Dict:
+        """Nested dict form used in reports and by existing callers."""
+        return {
+            'vessel_name': self.vessel_name,
+            'risk_score': self.risk_score,
+            'risk_category': self.risk_category,
+            'factor_breakdown': {
+                'age_factor': self.age_factor,
+                'history_factor': self.history_factor,
+                'mou_factor': self.mou_factor,
+                'age_weight': 0.4,
+                'history_weight': 0.4,
+                'mou_weight': 0.2
+            },
+            'vessel_info': {
+                'age_years': self.age_years,
+                'vessel_type': self.vessel_type,
+                'flag_state': self.flag_state,
+                'built_year': self.built_year,
+                'dwt': self.dwt
+            }
+        }
+
 class RiskCalculator_Maritime:
     """Maritime risk assessment specialist with core functionality."""
     
+    # 5x5 matrix axes, risk levels (1-25) and JSON-safe "row_col" cell keys
+    _PROB_LEVELS = ('Very Low', 'Low', 'Medium', 'High', 'Very High')
+    _SEV_LEVELS = ('Insignificant', 'Minor', 'Moderate', 'Major', 'Catastrophic')
+    _RISK_LEVELS = np.fromfunction(lambda i, j: (5 - i) * (j + 1), (5, 5))
+    _CELL_KEYS = tuple(f"{i}_{j}" for i in range(5) for j in range(5))
+    _HIGH_RISK_MASK = _RISK_LEVELS > 15
+    
     def __init__(self, data_path: str = "processed_data"):
         """Initialize the Risk Calculator with processed maritime data."""
         self.data_path = data_path
         self.vessel_data = None
         self.inspection_data = None
         self.risk_scores = {}
+        self._matrix_cache = {}
         
         # Risk scoring parameters
         self.age_weights = {
@@ -27,6 +127,11 @@ class RiskCalculator_Maritime:
             'very_old': (35, 100, 1.0)    # 35+ years: 100% risk
         }
         
+        # Sorted band edges and factors so the age band is a searchsorted lookup
+        bands = sorted(self.age_weights.values())
+        self._age_bins = np.array([b[0] for b in bands] + [bands[-1][1]], dtype=float)
+        self._age_risks = np.array([b[2] for b in bands])
+        
         # Load data
         self._load_data()
         
@@ -34,12 +139,23 @@ class RiskCalculator_Maritime:
         """Load processed maritime data from JSON files."""
         try:
             # Load vessel master data
-            with open(f"{self.data_path}/core_master/vessel_master.json", 'r') as f:
-                self.vessel_data = json.load(f)
+            self.vessel_data = self._read_json(f"{self.data_path}/core_master/vessel_master.json")
+                
+            # Load inspection analytics, keeping only the KPIs and performance fields used for scoring
+            raw = self._read_json(f"{self.data_path}/analytics/inspection_fact.json")
+            self.inspection_data = {section: raw[section] for section in _INSPECTION_SECTIONS}
+            self.inspection_data['vessel_performance'] = [
+                {field: p[field] for field in _PERF_FIELDS if field in p} for p in raw['vessel_performance']
+            ]
                 
-            # Load inspection analytics
-            with open(f"{self.data_path}/analytics/inspection_fact.json", 'r') as f:
-                self.inspection_data = json.load(f)
+            # Name indices so per-vessel lookups are O(1) instead of list scans
+            self._vessel_by_name = {v['vessel_name']: v for v in self.vessel_data['vessels']}
+            self._build_perf_table()
+            
+            # Column arrays for the whole fleet, scored once up front
+            self._build_soa()
+            self._score_arrays = self._compute_all_scores_vectorized()
+            self._results = self.scoreFleet()
                 
             print(f"SUCCESS: Loaded data for {len(self.vessel_data['vessels'])} vessels")
             print(f"SUCCESS: Loaded {self.inspection_data['fleet_kpis']['total_inspections']} inspections")
@@ -49,70 +165,37 @@ class RiskCalculator_Maritime:
             print(f"ERROR: Error loading data: {str(e)}")
             raise
             
+    @staticmethod
+    def _read_json(path: str):
+        """Parse a JSON file, using orjson when it is installed."""
+        if orjson is not None:
+            with open(path, 'rb') as f:
+                return orjson.loads(f.read())
+        with open(path, 'r') as f:
+            return json.load(f)
+            
+    def invalidate_cache(self):
+        """Drop memoized risk results and matrices, e.g. after reloading vessel data."""
+        self.risk_scores.clear()
+        self._matrix_cache.clear()
+        
     def calculateRiskScore(self, vessel_name: str) -> Dict:
         """
         Calculate comprehensive risk score for a vessel.
         Formula: riskScore = A*0.4 + H*0.4 + M*0.2
         """
+        cached = self.risk_scores.get(vessel_name)
+        if cached is not None:
+            return cached
+            
         try:
-            # Find vessel in master data
-            vessel_info = None
-            for vessel in self.vessel_data['vessels']:
-                if vessel['vessel_name'] == vessel_name:
-                    vessel_info = vessel
-                    break
+            # Find vessel in the precomputed fleet arrays
+            idx = self._vessel_index.get(vessel_name)
                     
-            if not vessel_info:
+            if idx is None:
                 raise ValueError(f"Vessel {vessel_name} not found in master data")
                 
-            # Find vessel in inspection data
-            inspection_info = None
-            for vessel_perf in self.inspection_data['vessel_performance']:
-                if vessel_perf['vessel_name'] == vessel_name:
-                    inspection_info = vessel_perf
-                    break
-                    
-            # Calculate A Component (Age Factor)
-            age_score = self._calculate_age_factor(vessel_info['age_years'])
-            
-            # Calculate H Component (Historical Defect Factor)
-            if inspection_info:
-                history_score = self._calculate_history_factor(inspection_info)
-            else:
-                history_score = 50.0
-                
-            # Calculate M Component (MOU Risk Factor)
-            mou_score = self._calculate_mou_factor(vessel_info, inspection_info)
-            
-            # Final risk score calculation
-            risk_score = (age_score * 0.4) + (history_score * 0.4) + (mou_score * 0.2)
-            
-            # Clamp to 0-100 range
-            risk_score = max(0, min(100, risk_score))
-            
-            # Determine risk category
-            risk_category = self._get_risk_category(risk_score)
-            
-            result = {
-                'vessel_name': vessel_name,
-                'risk_score': round(risk_score, 1),
-                'risk_category': risk_category,
-                'factor_breakdown': {
-                    'age_factor': round(age_score, 1),
-                    'history_factor': round(history_score, 1),
-                    'mou_factor': round(mou_score, 1),
-                    'age_weight': 0.4,
-                    'history_weight': 0.4,
-                    'mou_weight': 0.2
-                },
-                'vessel_info': {
-                    'age_years': vessel_info['age_years'],
-                    'vessel_type': vessel_info['vessel_type'],
-                    'flag_state': vessel_info['flag_state'],
-                    'built_year': vessel_info['built_year'],
-                    'dwt': vessel_info.get('dwt', 0)
-                }
-            }
+            result = self._results[idx].to_dict()
             
             # Store in cache
             self.risk_scores[vessel_name] = result
@@ -122,96 +205,127 @@ class RiskCalculator_Maritime:
             print(f"ERROR: Error calculating risk score for {vessel_name}: {str(e)}")
             return {'error': str(e)}
             
-    def _calculate_age_factor(self, age_years: float) -> float:
-        """Calculate age-based risk factor (0-100 scale)."""
-        for category, (min_age, max_age, risk_factor) in self.age_weights.items():
-            if min_age <= age_years < max_age:
-                # Linear interpolation within age band
-                if max_age == 100:  # Handle very_old category
-                    return risk_factor * 100
-                age_range = max_age - min_age
-                position = (age_years - min_age) / age_range
-                return risk_factor * 100 * (0.5 + 0.5 * position)
-        
-        # Default for very old vessels
-        return 100.0
-        
-    def _calculate_history_factor(self, inspection_info: Dict) -> float:
-        """Calculate historical defect-based risk factor."""
-        if not inspection_info or inspection_info['inspections'] == 0:
-            return 50.0  # Moderate risk for no history
-            
-        # Base risk from deficiency rate
-        avg_deficiencies = inspection_info['avg_deficiencies']
-        detention_rate = inspection_info['detention_rate'] / 100.0
-        clean_rate = inspection_info['clean_rate'] / 100.0
-        
-        # Deficiency risk (0-70 points)
-        defect_risk = min(70, avg_deficiencies * 8)  # 8 points per average deficiency
-        
-        # Detention risk (0-25 points)  
-        detention_risk = detention_rate * 25
+    def scoreFleet(self) -> List[RiskResult]:
+        """Risk results for every vessel in master data, in master data order."""
+        age_scores, history_scores, mou_scores, risk_scores, category_codes = self._score_arrays
+        return [
+            RiskResult(
+                vessel_name=vessel['vessel_name'],
+                risk_score=round(risk, 1),
+                risk_category=_RISK_CATEGORIES[code],
+                age_factor=round(age, 1),
+                history_factor=round(history, 1),
+                mou_factor=round(mou, 1),
+                age_years=vessel['age_years'],
+                vessel_type=vessel['vessel_type'],
+                flag_state=vessel['flag_state'],
+                built_year=vessel['built_year'],
+                dwt=vessel.get('dwt', 0)
+            )
+            for vessel, age, history, mou, risk, code in zip(
+                self.vessel_data['vessels'], age_scores.tolist(), history_scores.tolist(),
+                mou_scores.tolist(), risk_scores.tolist(), category_codes.tolist())
+        ]
+        
+    def _build_perf_table(self):
+        """Keep vessel_performance as columns; the list of dicts stays for JSON output."""
+        perf = self.inspection_data['vessel_performance']
+        self._perf_table = {
+            'vessel_name': tuple(p['vessel_name'] for p in perf),
+            'inspections': np.array([p['inspections'] for p in perf], dtype=float),
+            'avg_deficiencies': np.array([p['avg_deficiencies'] for p in perf], dtype=float),
+            'detention_rate': np.array([p['detention_rate'] for p in perf], dtype=float),
+            'clean_rate': np.array([p['clean_rate'] for p in perf], dtype=float),
+            'trend_code': np.array([_TREND_CODES.get(p.get('performance_trend', 'Stable'), 2) for p in perf], dtype=int)
+        }
+        self._perf_row_by_name = {name: i for i, name in enumerate(self._perf_table['vessel_name'])}
+        
+    def _build_soa(self):
+        """Convert vessel and inspection records into column arrays aligned by vessel index."""
+        vessels = self.vessel_data['vessels']
+        n = len(vessels)
+        self._vessel_index = {v['vessel_name']: i for i, v in enumerate(vessels)}
+        
+        soa = {
+            'ages': np.array([v['age_years'] for v in vessels], dtype=float),
+            'inspections': np.zeros(n),
+            'avg_def': np.zeros(n),
+            'det_rate': np.zeros(n),
+            'clean_rate': np.zeros(n),
+            'trend_mod': np.ones(n),
+            'flag_mod': np.ones(n),
+            'type_mod': np.ones(n),
+            'class_mod': np.ones(n)
+        }
         
-        # Clean inspection bonus (subtract up to 15 points)
-        clean_bonus = clean_rate * 15
+        for i, vessel in enumerate(vessels):
+            soa['flag_mod'][i], soa['type_mod'][i], soa['class_mod'][i] = self._mou_modifiers(vessel)
+            
+        # Gather inspection columns for vessels that have a performance row
+        table = self._perf_table
+        perf_rows = np.array([self._perf_row_by_name.get(v['vessel_name'], -1) for v in vessels], dtype=int)
+        has_perf = perf_rows >= 0
+        rows = perf_rows[has_perf]
+        soa['inspections'][has_perf] = table['inspections'][rows]
+        soa['avg_def'][has_perf] = table['avg_deficiencies'][rows]
+        soa['det_rate'][has_perf] = table['detention_rate'][rows]
+        soa['clean_rate'][has_perf] = table['clean_rate'][rows]
+        soa['trend_mod'][has_perf] = _TREND_LUT[table['trend_code'][rows]]
+                
+        self._soa = soa
         
-        # Performance trend modifier
-        trend_modifier = self._get_trend_modifier(inspection_info.get('performance_trend', 'Stable'))
+    def _compute_all_scores_vectorized(self) -> Tuple[np.ndarray, ...]:
+        """Score every vessel at once; returns age, history, MOU, risk score and category code arrays."""
+        soa = self._soa
+        ages = soa['ages']
         
-        history_score = (defect_risk + detention_risk - clean_bonus) * trend_modifier
+        # Compiled single-loop kernel when numba is installed
+        if _NUMBA_AVAILABLE:
+            return score_batch(ages, soa['inspections'], soa['avg_def'], soa['det_rate'], soa['clean_rate'],
+                               soa['flag_mod'], soa['type_mod'], soa['class_mod'], soa['trend_mod'],
+                               self._age_bins, self._age_risks)
         
-        return max(0, min(100, history_score))
+        # A Component
+        age_scores = self._calculate_age_factor(ages)
         
-    def _calculate_mou_factor(self, vessel_info: Dict, inspection_info: Dict = None) -> float:
-        """Calculate MOU-based risk factor."""
-        base_mou_risk = 50.0  # Default moderate risk
+        # H Component: vessels without inspection history get a moderate 50
+        defect_risk = np.minimum(70, soa['avg_def'] * 8)
+        detention_risk = soa['det_rate'] / 100.0 * 25
+        clean_bonus = soa['clean_rate'] / 100.0 * 15
+        history_scores = np.clip((defect_risk + detention_risk - clean_bonus) * soa['trend_mod'], 0, 100)
+        history_scores = np.where(soa['inspections'] == 0, 50.0, history_scores)
         
-        # Flag state risk modifier
-        flag_risk_modifiers = {
-            'Panama': 1.1,      # Higher risk due to flag of convenience
-            'Marshall Islands': 1.1,
-            'Korea': 0.9,       # Lower risk, good maritime administration
-            'Japan': 0.8,
-            'Norway': 0.8
-        }
+        # M Component
+        mou_scores = np.clip(50.0 * soa['flag_mod'] * soa['type_mod'] * soa['class_mod'], 0, 100)
         
-        flag_modifier = flag_risk_modifiers.get(vessel_info['flag_state'], 1.0)
+        risk_scores = np.clip((age_scores * 0.4) + (history_scores * 0.4) + (mou_scores * 0.2), 0, 100)
+        category_codes = np.digitize(risk_scores, _CATEGORY_BOUNDS, right=True)
         
-        # Vessel type risk modifier
-        type_risk_modifiers = {
-            'PC(T)C': 1.0,      # Standard risk
-            'Bulk': 0.9,        # Slightly lower risk based on fleet data
-            'Container': 0.85,
-            'Tanker': 1.2
-        }
-        
-        type_modifier = type_risk_modifiers.get(vessel_info['vessel_type'], 1.0)
+        return age_scores, history_scores, mou_scores, risk_scores, category_codes
         
-        # Classification society modifier
-        class_risk_modifiers = {
-            'DNV': 0.9,         # Lower risk, good class society
-            'RINA': 1.0,
-            'KR': 0.9,          # Korean Register, good reputation
-            'ABS': 0.9,
-            'LR': 0.9
-        }
+    def _calculate_age_factor(self, age_years):
+        """Calculate age-based risk factor (0-100 scale) for one age or an array of ages."""
+        ages = np.asarray(age_years, dtype=float)
+        band = np.searchsorted(self._age_bins, ages, side='right') - 1
+        in_range = (band >= 0) & (band < len(self._age_risks))
+        band = np.clip(band, 0, len(self._age_risks) - 1)
+        min_age, max_age, risk_factor = self._age_bins[band], self._age_bins[band + 1], self._age_risks[band]
         
-        class_modifier = class_risk_modifiers.get(vessel_info.get('classification_society', 'Unknown'), 1.0)
+        # Linear interpolation within age band; very_old (max_age 100) is flat
+        position = (ages - min_age) / (max_age - min_age)
+        scores = np.where(max_age == 100, risk_factor * 100, risk_factor * 100 * (0.5 + 0.5 * position))
         
-        mou_score = base_mou_risk * flag_modifier * type_modifier * class_modifier
+        # Default for very old vessels
+        scores = np.where(in_range, scores, 100.0)
+        return float(scores) if scores.ndim == 0 else scores
         
-        return max(0, min(100, mou_score))
+    def _mou_modifiers(self, vessel_info: Dict) -> Tuple[float, float, float]:
+        """Get flag state, vessel type and class society risk modifiers."""
+        flag_modifier = _FLAG_MOD.get(vessel_info['flag_state'], 1.0)
+        type_modifier = _TYPE_MOD.get(vessel_info['vessel_type'], 1.0)
+        class_modifier = _CLASS_MOD.get(vessel_info.get('classification_society', 'Unknown'), 1.0)
         
-    def _get_trend_modifier(self, trend: str) -> float:
-        """Get performance trend modifier."""
-        trend_modifiers = {
-            'Excellent': 0.7,
-            'Improving': 0.8,
-            'Stable': 1.0,
-            'Deteriorating': 1.3,
-            'Critical': 1.5
-        }
-        return trend_modifiers.get(trend, 1.0)
+        return flag_modifier, type_modifier, class_modifier
         
     def _get_risk_category(self, risk_score: float) -> str:
         """Classify risk score into categories."""
@@ -226,8 +340,21 @@ class RiskCalculator_Maritime:
             
     def generateRiskMatrix(self, vessels: List[str] = None) -> Dict:
         """Generate 5x5 risk matrix data."""
+        # Reuse the matrix built for the same vessel selection
+        key = None if vessels is None else tuple(vessels)
+        cached = self._matrix_cache.get(key)
+        if cached is None:
+            cached = self._matrix_cache[key] = self._build_risk_matrix(vessels)
+        matrix_data, self._matrix_np = cached
+        
+        # New dict per call, so callers can modify it and generated_at is current
+        self.risk_matrix = dict(matrix_data, generated_at=datetime.now().isoformat())
+        return self.risk_matrix
+        
+    def _build_risk_matrix(self, vessels: Optional[List[str]]) -> Tuple[Dict, np.ndarray]:
+        """Matrix data (without generated_at) and raw cell counts for a vessel selection."""
         if vessels is None:
-            vessels = [v['vessel_name'] for v in self.inspection_data['vessel_performance']]
+            vessels = self._perf_table['vessel_name']
             
         # Calculate risk scores for all vessels
         vessel_risks = []
@@ -236,63 +363,36 @@ class RiskCalculator_Maritime:
             if 'error' not in risk_data:
                 vessel_risks.append(risk_data)
                 
-        # Create 5x5 risk matrix
-        probability_levels = ['Very Low', 'Low', 'Medium', 'High', 'Very High']
-        severity_levels = ['Insignificant', 'Minor', 'Moderate', 'Major', 'Catastrophic']
+        # Map risk score to probability (based on historical performance) and
+        # severity (based on potential impact), then bin all vessels at once
+        risk_scores = np.array([r['risk_score'] for r in vessel_risks], dtype=float)
+        dwt = np.array([r['vessel_info']['dwt'] for r in vessel_risks], dtype=float)
+        prob_index = np.minimum(4, (risk_scores / 20).astype(int))
+        rows = 4 - self._severity_vec(dwt, risk_scores)
         
-        # Initialize matrix
         risk_matrix = np.zeros((5, 5))
-        vessel_distribution = {}
+        np.add.at(risk_matrix, (rows, prob_index), 1)
         
-        for i in range(5):
-            for j in range(5):
-                vessel_distribution[f"{i}_{j}"] = []
+        vessel_distribution = {key: [] for key in self._CELL_KEYS}
+        for risk_data, row, col in zip(vessel_risks, rows.tolist(), prob_index.tolist()):
+            vessel_distribution[self._CELL_KEYS[row * 5 + col]].append(risk_data['vessel_name'])
                 
-        # Distribute vessels into matrix cells
-        for risk_data in vessel_risks:
-            risk_score = risk_data['risk_score']
-            vessel_name = risk_data['vessel_name']
-            
-            # Map risk score to probability (based on historical performance)
-            prob_index = min(4, int(risk_score / 20))
-            
-            # Map risk score to severity (based on potential impact)
-            vessel_info = risk_data['vessel_info']
-            severity_index = self._calculate_severity_index(vessel_info, risk_score)
-            
-            risk_matrix[4-severity_index, prob_index] += 1
-            vessel_distribution[f"{4-severity_index}_{prob_index}"].append(vessel_name)
-            
-        # Calculate risk levels (1-25)
-        risk_levels = np.zeros((5, 5))
-        for i in range(5):
-            for j in range(5):
-                risk_levels[i, j] = (5 - i) * (j + 1)
-                
-        self.risk_matrix = {
+        # Raw counts kept for internal reductions; the dict holds JSON-ready lists
+        matrix_data = {
             'matrix': risk_matrix.tolist(),
-            'risk_levels': risk_levels.tolist(),
-            'probability_levels': probability_levels,
-            'severity_levels': severity_levels,
+            'risk_levels': self._RISK_LEVELS.tolist(),
+            'probability_levels': list(self._PROB_LEVELS),
+            'severity_levels': list(self._SEV_LEVELS),
             'vessel_distribution': vessel_distribution,
-            'total_vessels': len(vessel_risks),
-            'generated_at': datetime.now().isoformat()
+            'total_vessels': len(vessel_risks)
         }
+        return matrix_data, risk_matrix
         
-        return self.risk_matrix
-        
-    def _calculate_severity_index(self, vessel_info: Dict, risk_score: float) -> int:
-        """Calculate severity index based on vessel characteristics and risk."""
-        base_severity = min(4, int(risk_score / 20))
-        
-        # Adjust based on vessel size (DWT)
-        dwt = vessel_info.get('dwt', 0)
-        if dwt > 100000:  # Large vessels
-            base_severity = min(4, base_severity + 1)
-        elif dwt < 20000:  # Small vessels
-            base_severity = max(0, base_severity - 1)
-            
-        return base_severity
+    def _severity_vec(self, dwt: np.ndarray, risk_scores: np.ndarray) -> np.ndarray:
+        """Severity indices for arrays of DWT and risk scores."""
+        # Base severity from risk, +1 for large (>100k DWT) and -1 for small (<20k DWT) vessels
+        base_severity = np.minimum(4, (risk_scores / 20).astype(int))
+        return np.clip(base_severity + (dwt > 100000).astype(int) - (dwt < 20000).astype(int), 0, 4)
         
     def simulateScenario(self, scenario_name: str, parameters: Dict) -> Dict:
         """Run risk mitigation scenario simulations."""
@@ -305,90 +405,58 @@ class RiskCalculator_Maritime:
         }
         
         try:
-            vessels = parameters.get('vessels', [v['vessel_name'] for v in self.inspection_data['vessel_performance']])
+            vessels = parameters.get('vessels', self._perf_table['vessel_name'])
+            n_vessels = len(vessels)
             
             # Baseline risk scores
             baseline_scores = {}
             for vessel in vessels:
                 baseline_scores[vessel] = self.calculateRiskScore(vessel)
                 
-            # Apply scenario modifications
-            modified_scores = {}
+            # A/H/M factor breakdowns of the scorable vessels as an (n, 3) array
+            scored = [vessel for vessel in vessels if 'error' not in baseline_scores[vessel]]
+            factors = np.array([
+                [baseline_scores[vessel]['factor_breakdown'][key] for key in ('age_factor', 'history_factor', 'mou_factor')]
+                for vessel in scored
+            ], dtype=float).reshape(-1, 3)
             
+            # Apply scenario modifications
             if scenario_name == 'training_impact':
                 # Reduce historical defect factor by specified percentage
                 reduction_pct = parameters.get('defect_reduction', 20) / 100.0
+                factors[:, 1] *= 1 - reduction_pct
                 
-                for vessel in vessels:
-                    baseline = baseline_scores[vessel]
-                    if 'error' not in baseline:
-                        # Calculate modified history factor
-                        original_h = baseline['factor_breakdown']['history_factor']
-                        modified_h = original_h * (1 - reduction_pct)
-                        
-                        # Recalculate risk score
-                        a_factor = baseline['factor_breakdown']['age_factor']
-                        m_factor = baseline['factor_breakdown']['mou_factor']
-                        
-                        new_risk_score = (a_factor * 0.4) + (modified_h * 0.4) + (m_factor * 0.2)
-                        new_risk_score = max(0, min(100, new_risk_score))
-                        
-                        modified_scores[vessel] = {
-                            'risk_score': new_risk_score,
-                            'risk_category': self._get_risk_category(new_risk_score)
-                        }
-                        
             elif scenario_name == 'maintenance_improvement':
                 # Improve age-related risk through better maintenance
                 age_improvement = parameters.get('age_risk_reduction', 15) / 100.0
+                factors[:, 0] *= 1 - age_improvement
                 
-                for vessel in vessels:
-                    baseline = baseline_scores[vessel]
-                    if 'error' not in baseline:
-                        # Calculate modified age factor
-                        original_a = baseline['factor_breakdown']['age_factor']
-                        modified_a = original_a * (1 - age_improvement)
-                        
-                        # Recalculate risk score
-                        h_factor = baseline['factor_breakdown']['history_factor']
-                        m_factor = baseline['factor_breakdown']['mou_factor']
-                        
-                        new_risk_score = (modified_a * 0.4) + (h_factor * 0.4) + (m_factor * 0.2)
-                        new_risk_score = max(0, min(100, new_risk_score))
-                        
-                        modified_scores[vessel] = {
-                            'risk_score': new_risk_score,
-                            'risk_category': self._get_risk_category(new_risk_score)
-                        }
-                        
-            # Calculate impact analysis
-            total_reduction = 0
-            vessels_improved = 0
-            
-            for vessel in vessels:
-                if vessel in baseline_scores and vessel in modified_scores:
-                    baseline_score = baseline_scores[vessel]['risk_score']
-                    modified_score = modified_scores[vessel]['risk_score']
-                    
-                    reduction = baseline_score - modified_score
-                    total_reduction += reduction
-                    
-                    if reduction > 0:
-                        vessels_improved += 1
-                        
-                    # Store vessel analysis
-                    scenario_results['vessels_analyzed'].append({
-                        'vessel_name': vessel,
-                        'baseline_score': baseline_score,
-                        'modified_score': modified_score,
-                        'risk_reduction': reduction,
-                        'baseline_category': baseline_scores[vessel]['risk_category'],
-                        'modified_category': modified_scores[vessel]['risk_category']
-                    })
+            else:
+                scored = []
+                factors = factors[:0]
+                
+            # Recalculate risk scores and impact analysis for all vessels at once
+            modified = np.clip((factors[:, 0] * 0.4) + (factors[:, 1] * 0.4) + (factors[:, 2] * 0.2), 0, 100)
+            baseline = np.array([baseline_scores[vessel]['risk_score'] for vessel in scored], dtype=float)
+            reduction = baseline - modified
+            total_reduction = float(reduction.sum())
+            vessels_improved = int((reduction > 0).sum())
+            
+            # Store vessel analysis
+            for vessel, baseline_score, modified_score, risk_reduction in zip(
+                    scored, baseline.tolist(), modified.tolist(), reduction.tolist()):
+                scenario_results['vessels_analyzed'].append({
+                    'vessel_name': vessel,
+                    'baseline_score': baseline_score,
+                    'modified_score': modified_score,
+                    'risk_reduction': risk_reduction,
+                    'baseline_category': baseline_scores[vessel]['risk_category'],
+                    'modified_category': self._get_risk_category(modified_score)
+                })
                     
             # Calculate summary statistics
-            avg_reduction = total_reduction / len(vessels) if vessels else 0
-            improvement_rate = (vessels_improved / len(vessels) * 100) if vessels else 0
+            avg_reduction = total_reduction / n_vessels if n_vessels else 0
+            improvement_rate = (vessels_improved / n_vessels * 100) if n_vessels else 0
             
             # ROI calculation
             cost_estimates = {
@@ -403,7 +471,7 @@ class RiskCalculator_Maritime:
             roi_5_year = ((annual_savings * 5) - cost) / cost * 100 if cost > 0 else 0
             
             scenario_results['summary'] = {
-                'total_vessels': len(vessels),
+                'total_vessels': n_vessels,
                 'vessels_improved': vessels_improved,
                 'improvement_rate_pct': round(improvement_rate, 1),
                 'average_risk_reduction': round(avg_reduction, 2),
@@ -427,21 +495,23 @@ class RiskCalculator_Maritime:
         
         # Calculate risk scores for all vessels
         fleet_risks = []
-        for vessel in self.inspection_data['vessel_performance']:
-            risk_data = self.calculateRiskScore(vessel['vessel_name'])
+        for vessel_name in self._perf_table['vessel_name']:
+            risk_data = self.calculateRiskScore(vessel_name)
             if 'error' not in risk_data:
                 fleet_risks.append(risk_data)
                 
         # Fleet statistics
         total_vessels = len(fleet_risks)
-        avg_fleet_risk = np.mean([v['risk_score'] for v in fleet_risks])
+        risk_scores = np.array([v['risk_score'] for v in fleet_risks], dtype=float)
+        avg_fleet_risk = np.mean(risk_scores)
         
         risk_distribution = {'LOW': 0, 'MEDIUM': 0, 'HIGH': 0, 'CRITICAL': 0}
         for vessel in fleet_risks:
             risk_distribution[vessel['risk_category']] += 1
             
-        # Top risk vessels
-        top_risk_vessels = sorted(fleet_risks, key=lambda x: x['risk_score'], reverse=True)[:5]
+        # Top risk vessels: stable sort keeps fleet order among tied scores, as sorted(...)[:5] does
+        top_idx = np.argsort(-risk_scores, kind='stable')[:5]
+        top_risk_vessels = [fleet_risks[i] for i in top_idx]
         
         # Generate risk matrix
         risk_matrix = self.generateRiskMatrix()
@@ -467,16 +537,20 @@ class RiskCalculator_Maritime:
             ],
             'risk_matrix_summary': {
                 'total_vessels_in_matrix': risk_matrix['total_vessels'],
-                'high_risk_cells': sum(1 for i in range(5) for j in range(5) if risk_matrix['risk_levels'][i][j] > 15),
-                'vessels_in_high_risk': sum(risk_matrix['matrix'][i][j] for i in range(5) for j in range(5) if risk_matrix['risk_levels'][i][j] > 15)
+                'high_risk_cells': int(self._HIGH_RISK_MASK.sum()),
+                'vessels_in_high_risk': float(self._matrix_np[self._HIGH_RISK_MASK].sum())
             },
             'vessel_details': fleet_risks,
             'risk_matrix': risk_matrix
         }
         
         if save_path:
-            with open(save_path, 'w') as f:
-                json.dump(report, f, indent=2)
+            if orjson is not None:
+                with open(save_path, 'wb') as f:
+                    f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+            else:
+                with open(save_path, 'w') as f:
+                    json.dump(report, f, indent=2)
             print(f"SUCCESS: Fleet report saved to {save_path}")
             
         return report
@@ -498,7 +572,8 @@ class RiskCalculator_Maritime:
         print(f"{'Severity':>15} | {'Very Low':>8} {'Low':>8} {'Medium':>8} {'High':>8} {'Very High':>8}")
         print("-" * 80)
         
-        # Matrix rows
+        # Matrix rows, written in one call
+        buf = StringIO()
         for i in range(5):
             row_data = []
             for j in range(5):
@@ -509,7 +584,8 @@ class RiskCalculator_Maritime:
                 else:
                     row_data.append(f"0v({risk_level})")
             
-            print(f"{severity_levels[i]:>15} | {row_data[0]:>8} {row_data[1]:>8} {row_data[2]:>8} {row_data[3]:>8} {row_data[4]:>8}")
+            buf.write(f"{severity_levels[i]:>15} | {row_data[0]:>8} {row_data[1]:>8} {row_data[2]:>8} {row_data[3]:>8} {row_data[4]:>8}\n")
+        sys.stdout.write(buf.getvalue())
         
         print("\nLegend: Xv(Y) = X vessels, Risk Level Y")
         print("Risk Levels: 1-5 (Low) | 6-10 (Medium) | 11-15 (High) | 16-25 (Critical)")
@@ -526,16 +602,18 @@ def main():
         print("\nCalculating Risk Scores for All Vessels:")
         print("-" * 50)
         
-        # Calculate risks for all vessels with inspection data
+        # Calculate risks for all vessels with inspection data; buffer the per-vessel lines
         all_risks = []
-        for vessel in calculator.inspection_data['vessel_performance']:
-            risk_data = calculator.calculateRiskScore(vessel['vessel_name'])
+        buf = StringIO()
+        for vessel_name in calculator._perf_table['vessel_name']:
+            risk_data = calculator.calculateRiskScore(vessel_name)
             if 'error' not in risk_data:
                 all_risks.append(risk_data)
-                print(f"{risk_data['vessel_name']:15} | Risk: {risk_data['risk_score']:5.1f} ({risk_data['risk_category']:8}) | "
-                      f"A:{risk_data['factor_breakdown']['age_factor']:4.1f} "
-                      f"H:{risk_data['factor_breakdown']['history_factor']:4.1f} "
-                      f"M:{risk_data['factor_breakdown']['mou_factor']:4.1f}")
+                buf.write(f"{risk_data['vessel_name']:15} | Risk: {risk_data['risk_score']:5.1f} ({risk_data['risk_category']:8}) | "
+                          f"A:{risk_data['factor_breakdown']['age_factor']:4.1f} "
+                          f"H:{risk_data['factor_breakdown']['history_factor']:4.1f} "
+                          f"M:{risk_data['factor_breakdown']['mou_factor']:4.1f}\n")
+        sys.stdout.write(buf.getvalue())
         
         # Display risk matrix
         calculator.display_risk_matrix_text()
@@ -544,9 +622,11 @@ def main():
         print("\nHigh-Risk Vessels (>75 Risk Score):")
         print("-" * 40)
         high_risk_vessels = [v for v in all_risks if v['risk_score'] > 75]
+        buf = StringIO()
         for vessel in sorted(high_risk_vessels, key=lambda x: x['risk_score'], reverse=True):
-            print(f"* {vessel['vessel_name']} - {vessel['risk_score']:.1f} ({vessel['risk_category']})")
-            print(f"  Age: {vessel['vessel_info']['age_years']:.1f} years | Type: {vessel['vessel_info']['vessel_type']}")
+            buf.write(f"* {vessel['vessel_name']} - {vessel['risk_score']:.1f} ({vessel['risk_category']})\n"
+                      f"  Age: {vessel['vessel_info']['age_years']:.1f} years | Type: {vessel['vessel_info']['vessel_type']}\n")
+        sys.stdout.write(buf.getvalue())
         
         if not high_risk_vessels:
             print("SUCCESS: No critical risk vessels found!")
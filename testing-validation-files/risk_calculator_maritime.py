@@ -8,19 +8,29 @@ Comprehensive maritime risk assessment system with:
 - Visual risk heatmaps and actionable recommendations
 """
 
+import hashlib
+import heapq
 import json
+import os
+from functools import cached_property
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
+from typing import TYPE_CHECKING, Dict, List, Tuple, Optional
+
+try:
+    import orjson
+except ImportError:  # Optional: faster JSON load and report writes
+    orjson = None
+
+from risk_kernels import history_kernel, mou_kernel, score_fleet, _NUMBA_AVAILABLE
 import warnings
 warnings.filterwarnings('ignore')
 
+# Plotting libraries are imported where they are used, so scoring-only callers skip them
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
 class RiskCalculator_Maritime:
     """
     Elite maritime risk assessment specialist with sophisticated risk modeling.
@@ -34,14 +44,19 @@ class RiskCalculator_Maritime:
     - M (MOU Criteria): Port State Control MOU performance indicators
     """
     
+    # Risk categories in severity order; category codes index this list
+    _RISK_CATEGORIES = ['LOW', 'MEDIUM', 'HIGH', 'CRITICAL']
+    
+    # Bump when _build_fleet_frame or the frame columns change, so older disk caches are not reused
+    _CACHE_VERSION = 1
+    
     def __init__(self, data_path: str = "processed_data"):
         """Initialize the Risk Calculator with processed maritime data."""
         self.data_path = data_path
-        self.vessel_data = None
-        self.inspection_data = None
         self.mou_data = None
         self.risk_scores = {}
         self.risk_matrix = None
+        self._fig_cache = {}
         
         # Risk scoring parameters
         self.age_weights = {
@@ -52,6 +67,11 @@ class RiskCalculator_Maritime:
             'very_old': (35, 100, 1.0)    # 35+ years: 100% risk
         }
         
+        # Age band edges and base risks as arrays; the open-ended last band runs to inf
+        bands = sorted(self.age_weights.values())
+        self._age_edges = np.array([b[0] for b in bands] + [np.inf])
+        self._age_base = np.array([b[2] for b in bands])
+        
         self.defect_severity_weights = {
             'Critical': 1.0,    # Life Saving, Navigation, Structure
             'High': 0.75,       # Machinery, Security
@@ -68,28 +88,247 @@ class RiskCalculator_Maritime:
             'Other': 0.6
         }
         
-        # Load data
+        self.flag_risk_modifiers = {
+            'Panama': 1.1,      # Higher risk due to flag of convenience
+            'Marshall Islands': 1.1,
+            'Korea': 0.9,       # Lower risk, good maritime administration
+            'Japan': 0.8,
+            'Norway': 0.8
+        }
+        
+        self.type_risk_modifiers = {
+            'PC(T)C': 1.0,      # Standard risk
+            'Bulk': 0.9,        # Slightly lower risk based on fleet data
+            'Container': 0.85,
+            'Tanker': 1.2
+        }
+        
+        self.class_risk_modifiers = {
+            'DNV': 0.9,         # Lower risk, good class society
+            'RINA': 1.0,
+            'KR': 0.9,          # Korean Register, good reputation
+            'ABS': 0.9,
+            'LR': 0.9
+        }
+        
+        self.trend_modifiers = {
+            'Excellent': 0.7,
+            'Improving': 0.8,
+            'Stable': 1.0,
+            'Deteriorating': 1.3,
+            'Critical': 1.5
+        }
+        
+    # Data is loaded on first access to any of these, not at construction
+    @cached_property
+    def vessel_data(self) -> Dict:
+        """Vessel master data."""
+        self._load_data()
+        return self.vessel_data
+        
+    @cached_property
+    def inspection_data(self) -> Dict:
+        """Inspection analytics, including per-vessel performance."""
+        self._load_data()
+        return self.inspection_data
+        
+    @cached_property
+    def _fleet_df(self) -> pd.DataFrame:
+        """Fleet-wide A/H/M factors for batch operations."""
         self._load_data()
+        return self._fleet_df
+        
+    # Name indices so per-vessel lookups are O(1) instead of list scans
+    @cached_property
+    def _vessel_by_name(self) -> Dict[str, Dict]:
+        return {v['vessel_name']: v for v in self.vessel_data['vessels']}
+        
+    @cached_property
+    def _perf_by_name(self) -> Dict[str, Dict]:
+        return {p['vessel_name']: p for p in self.inspection_data['vessel_performance']}
+        
+    @cached_property
+    def _peer_groups(self) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        return self._build_peer_groups()
         
     def _load_data(self):
-        """Load processed maritime data from JSON files."""
+        """
+        Load processed maritime data from JSON files.
+        Sets vessel_data, inspection_data and _fleet_df together, so a failed load leaves none of them set.
+        """
         try:
+            vessel_path = f"{self.data_path}/core_master/vessel_master.json"
+            inspection_path = f"{self.data_path}/analytics/inspection_fact.json"
+            
             # Load vessel master data
-            with open(f"{self.data_path}/core_master/vessel_master.json", 'r') as f:
-                self.vessel_data = json.load(f)
+            vessel_data = self._read_json(vessel_path)
                 
             # Load inspection analytics
-            with open(f"{self.data_path}/analytics/inspection_fact.json", 'r') as f:
-                self.inspection_data = json.load(f)
+            inspection_data = self._read_json(inspection_path)
+            
+            # Reuse the fleet frame cached for these exact source files and scoring parameters
+            cache_path = self._fleet_cache_path([vessel_path, inspection_path])
+            fleet_df = self._read_fleet_cache(cache_path)
+            if fleet_df is None:
+                fleet_df = self._build_fleet_frame(vessel_data, inspection_data)
+                self._write_fleet_cache(cache_path, fleet_df)
+                
+            self.vessel_data, self.inspection_data, self._fleet_df = vessel_data, inspection_data, fleet_df
                 
-            print(f"✅ Loaded data for {len(self.vessel_data['vessels'])} vessels")
-            print(f"✅ Loaded {self.inspection_data['fleet_kpis']['total_inspections']} inspections")
-            print(f"✅ Loaded {self.inspection_data['compliance_kpis']['total_deficiencies']} deficiencies")
+            print(f"✅ Loaded data for {len(vessel_data['vessels'])} vessels")
+            print(f"✅ Loaded {inspection_data['fleet_kpis']['total_inspections']} inspections")
+            print(f"✅ Loaded {inspection_data['compliance_kpis']['total_deficiencies']} deficiencies")
             
         except Exception as e:
             print(f"❌ Error loading data: {str(e)}")
             raise
             
+    @staticmethod
+    def _read_json(path: str):
+        """Parse a JSON file, using orjson when it is installed."""
+        if orjson is not None:
+            with open(path, 'rb') as f:
+                return orjson.loads(f.read())
+        with open(path, 'r') as f:
+            return json.load(f)
+            
+    def _scoring_params(self) -> Tuple:
+        """Scoring parameters the fleet frame depends on, used to validate the disk cache."""
+        return (self.age_weights, self.flag_risk_modifiers, self.type_risk_modifiers,
+                self.class_risk_modifiers, self.trend_modifiers)
+        
+    def _fleet_cache_path(self, source_paths: List[str]) -> str:
+        """
+        Parquet cache file for the fleet frame, named by a hash of the cache version,
+        the source files' mtimes and sizes, and the scoring parameters.
+        """
+        sources = [(p, os.stat(p).st_mtime_ns, os.stat(p).st_size) for p in source_paths]
+        key = repr((self._CACHE_VERSION, sources, self._scoring_params())).encode()
+        digest = hashlib.blake2b(key, digest_size=16).hexdigest()
+        return os.path.join(self.data_path, '.cache', f"fleet-{digest}.parquet")
+        
+    @staticmethod
+    def _read_fleet_cache(cache_path: str) -> Optional[pd.DataFrame]:
+        """Return the cached fleet frame, or None if it is missing or cannot be read for any reason."""
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            return pd.read_parquet(cache_path)
+        except Exception:
+            # Corrupt file, no parquet engine or a format from another library version: rebuild
+            return None
+        
+    @staticmethod
+    def _write_fleet_cache(cache_path: str, fleet_df: pd.DataFrame):
+        """Save the fleet frame and drop caches for older keys; any failure just skips caching."""
+        cache_dir = os.path.dirname(cache_path)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            fleet_df.to_parquet(tmp_path)
+            # Atomic swap so a concurrent reader never sees a partial file
+            os.replace(tmp_path, cache_path)
+            for name in os.listdir(cache_dir):
+                if name.startswith('fleet-') and name.endswith('.parquet') and name != os.path.basename(cache_path):
+                    os.remove(os.path.join(cache_dir, name))
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            
+    @staticmethod
+    def _gather_modifiers(values: pd.Series, modifiers: Dict[str, float]) -> np.ndarray:
+        """Map category values to modifiers via Categorical codes; unknown or missing values get 1.0."""
+        codes = pd.Categorical(values, categories=list(modifiers)).codes
+        # Code -1 (not a known category) indexes the trailing 1.0 default
+        table = np.append(np.fromiter(modifiers.values(), dtype=float, count=len(modifiers)), 1.0)
+        return table[codes]
+        
+    def _build_fleet_frame(self, vessel_data: Dict, inspection_data: Dict) -> pd.DataFrame:
+        """
+        Join vessel master and inspection performance into one frame indexed by vessel name,
+        with the A, H and M factors and risk score computed for every vessel at once.
+        """
+        perf_columns = ['vessel_name', 'inspections', 'avg_deficiencies', 'detention_rate', 'clean_rate', 'performance_trend']
+        vessels = pd.DataFrame.from_records(vessel_data['vessels'])
+        perf = pd.DataFrame.from_records(inspection_data['vessel_performance']).reindex(columns=perf_columns)
+        
+        # Last record wins on duplicate names, matching the name indices
+        df = vessels.drop_duplicates('vessel_name', keep='last').merge(
+            perf.drop_duplicates('vessel_name', keep='last'), on='vessel_name', how='left'
+        ).set_index('vessel_name')
+        
+        if 'classification_society' not in df:
+            df['classification_society'] = 'Unknown'
+        df['flag_mod'] = self._gather_modifiers(df['flag_state'], self.flag_risk_modifiers)
+        df['type_mod'] = self._gather_modifiers(df['vessel_type'], self.type_risk_modifiers)
+        df['class_mod'] = self._gather_modifiers(df['classification_society'], self.class_risk_modifiers)
+        # Trend modifier resolved once per vessel here; a missing trend counts as 'Stable',
+        # as in _calculate_history_factor, so the column follows any retuning of that entry
+        df['trend_mod'] = self._gather_modifiers(df['performance_trend'].fillna('Stable'), self.trend_modifiers)
+        # Detention and clean inspection rates as 0-1 fractions, normalized once
+        df['det_frac'] = df['detention_rate'].to_numpy(dtype=float) / 100.0
+        df['clean_frac'] = df['clean_rate'].to_numpy(dtype=float) / 100.0
+        
+        # A Component
+        age = self._age_factor_vec(df['age_years'].to_numpy(dtype=float))
+        
+        # H Component: moderate risk (50) for vessels without inspection history
+        avg_def = df['avg_deficiencies'].to_numpy(dtype=float)
+        det_rate = df['det_frac'].to_numpy()
+        clean_rate = df['clean_frac'].to_numpy()
+        trend_mod = df['trend_mod'].to_numpy()
+        if _NUMBA_AVAILABLE:
+            history = history_kernel(avg_def, det_rate, clean_rate, trend_mod)
+        else:
+            # One output buffer updated in place instead of a temporary per step
+            history = np.minimum(70.0, avg_def * 8)
+            history += det_rate * 25
+            history -= clean_rate * 15
+            history *= trend_mod
+            np.clip(history, 0, 100, out=history)
+        has_history = df['inspections'].fillna(0).to_numpy() != 0
+        history = np.where(has_history, history, 50.0)
+        
+        # M Component
+        flag_mod, type_mod, class_mod = df['flag_mod'].to_numpy(), df['type_mod'].to_numpy(), df['class_mod'].to_numpy()
+        if _NUMBA_AVAILABLE:
+            mou = mou_kernel(flag_mod, type_mod, class_mod)
+        else:
+            mou = np.clip(50.0 * flag_mod * type_mod * class_mod, 0, 100)
+        
+        risk, category = self._score_vec(age, history, mou)
+        
+        df['A'] = age
+        df['H'] = history
+        df['M'] = mou
+        df['risk'] = risk
+        # Reported (rounded) values, as calculateRiskScore returns them
+        df['risk_score'] = [round(r, 1) for r in risk.tolist()]
+        df['risk_category'] = category.astype(str)
+        df['age_factor'] = [round(a, 1) for a in age.tolist()]
+        df['history_factor'] = [round(h, 1) for h in history.tolist()]
+        df['mou_factor'] = [round(m, 1) for m in mou.tolist()]
+        
+        return df
+        
+    def _build_peer_groups(self) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """Group inspected vessels' names and risk scores by vessel type, in inspection data order."""
+        names = [p['vessel_name'] for p in self.inspection_data['vessel_performance']
+                 if p['vessel_name'] in self._fleet_df.index]
+        inspected = self._fleet_df.loc[names, ['vessel_type', 'risk_score']]
+        
+        return {
+            vessel_type: (group.index.to_numpy(), group['risk_score'].to_numpy())
+            for vessel_type, group in inspected.groupby('vessel_type', sort=False)
+        }
+        
+    def invalidate_cache(self):
+        """Drop memoized risk results, e.g. after reloading vessel data."""
+        self.risk_scores.clear()
+        self._fig_cache.clear()
+        
     def calculateRiskScore(self, vessel_name: str) -> Dict:
         """
         Calculate comprehensive risk score for a vessel.
@@ -99,23 +338,18 @@ class RiskCalculator_Maritime:
         Returns:
             Dict with risk score breakdown and confidence intervals
         """
+        if vessel_name in self.risk_scores:
+            return self.risk_scores[vessel_name]
+            
         try:
             # Find vessel in master data
-            vessel_info = None
-            for vessel in self.vessel_data['vessels']:
-                if vessel['vessel_name'] == vessel_name:
-                    vessel_info = vessel
-                    break
+            vessel_info = self._vessel_by_name.get(vessel_name)
                     
             if not vessel_info:
                 raise ValueError(f"Vessel {vessel_name} not found in master data")
                 
             # Find vessel in inspection data
-            inspection_info = None
-            for vessel_perf in self.inspection_data['vessel_performance']:
-                if vessel_perf['vessel_name'] == vessel_name:
-                    inspection_info = vessel_perf
-                    break
+            inspection_info = self._perf_by_name.get(vessel_name)
                     
             # Calculate A Component (Age Factor)
             age_score = self._calculate_age_factor(vessel_info['age_years'])
@@ -130,39 +364,7 @@ class RiskCalculator_Maritime:
             # Calculate M Component (MOU Risk Factor)
             mou_score = self._calculate_mou_factor(vessel_info, inspection_info)
             
-            # Final risk score calculation
-            risk_score = (age_score * 0.4) + (history_score * 0.4) + (mou_score * 0.2)
-            
-            # Clamp to 0-100 range
-            risk_score = max(0, min(100, risk_score))
-            
-            # Determine risk category
-            risk_category = self._get_risk_category(risk_score)
-            
-            # Calculate confidence interval (±5 points based on data completeness)
-            confidence_lower = max(0, risk_score - 5)
-            confidence_upper = min(100, risk_score + 5)
-            
-            result = {
-                'vessel_name': vessel_name,
-                'risk_score': round(risk_score, 1),
-                'risk_category': risk_category,
-                'confidence_interval': (confidence_lower, confidence_upper),
-                'factor_breakdown': {
-                    'age_factor': round(age_score, 1),
-                    'history_factor': round(history_score, 1),
-                    'mou_factor': round(mou_score, 1),
-                    'age_weight': 0.4,
-                    'history_weight': 0.4,
-                    'mou_weight': 0.2
-                },
-                'vessel_info': {
-                    'age_years': vessel_info['age_years'],
-                    'vessel_type': vessel_info['vessel_type'],
-                    'flag_state': vessel_info['flag_state'],
-                    'built_year': vessel_info['built_year']
-                }
-            }
+            result = self._build_risk_result(vessel_name, vessel_info, age_score, history_score, mou_score)
             
             # Store in cache
             self.risk_scores[vessel_name] = result
@@ -173,19 +375,97 @@ class RiskCalculator_Maritime:
             print(f"❌ Error calculating risk score for {vessel_name}: {str(e)}")
             return {'error': str(e)}
             
+    def _build_risk_result(self, vessel_name: str, vessel_info: Dict, age_score: float,
+                           history_score: float, mou_score: float) -> Dict:
+        """Combine A, H and M factors into the result dict returned by calculateRiskScore."""
+        # Final risk score calculation
+        risk_score = (age_score * 0.4) + (history_score * 0.4) + (mou_score * 0.2)
+        
+        # Clamp to 0-100 range
+        risk_score = max(0, min(100, risk_score))
+        
+        # Determine risk category
+        risk_category = self._get_risk_category(risk_score)
+        
+        # Calculate confidence interval (±5 points based on data completeness)
+        confidence_lower = max(0, risk_score - 5)
+        confidence_upper = min(100, risk_score + 5)
+        
+        factor_breakdown = {
+            'age_factor': round(age_score, 1),
+            'history_factor': round(history_score, 1),
+            'mou_factor': round(mou_score, 1),
+            'age_weight': 0.4,
+            'history_weight': 0.4,
+            'mou_weight': 0.2
+        }
+        
+        result = {
+            'vessel_name': vessel_name,
+            'risk_score': round(risk_score, 1),
+            'risk_category': risk_category,
+            'confidence_interval': (confidence_lower, confidence_upper),
+            'factor_breakdown': factor_breakdown,
+            'primary_risk_factor': max(factor_breakdown, key=factor_breakdown.get),
+            'vessel_info': {
+                'age_years': vessel_info['age_years'],
+                'vessel_type': vessel_info['vessel_type'],
+                'flag_state': vessel_info['flag_state'],
+                'built_year': vessel_info['built_year']
+            }
+        }
+        
+        return result
+        
+    def calculateRiskScoresVectorized(self, vessels: List[str] = None) -> List[Dict]:
+        """
+        Risk score results for many vessels at once, from the factors precomputed in the fleet frame.
+        
+        Gives the same dicts as calculateRiskScore and shares its cache; vessels missing from
+        master data are reported and left out.
+        """
+        if vessels is None:
+            # Use all vessels with inspection data
+            vessels = [v['vessel_name'] for v in self.inspection_data['vessel_performance']]
+            
+        known = []
+        for vessel_name in vessels:
+            if vessel_name in self._fleet_df.index:
+                known.append(vessel_name)
+            else:
+                self.calculateRiskScore(vessel_name)
+        fleet = self._fleet_df.loc[known]
+        
+        results = []
+        for vessel_name, age_score, history_score, mou_score in zip(
+                known, fleet['A'].tolist(), fleet['H'].tolist(), fleet['M'].tolist()):
+            result = self.risk_scores.get(vessel_name)
+            if result is None:
+                # Clamp as the scalar factor helpers do, so bound values keep the same type
+                result = self._build_risk_result(vessel_name, self._vessel_by_name[vessel_name], age_score,
+                                                 max(0, min(100, history_score)), max(0, min(100, mou_score)))
+                self.risk_scores[vessel_name] = result
+            results.append(result)
+            
+        return results
+        
     def _calculate_age_factor(self, age_years: float) -> float:
         """Calculate age-based risk factor (0-100 scale)."""
-        for category, (min_age, max_age, risk_factor) in self.age_weights.items():
-            if min_age <= age_years < max_age:
-                # Linear interpolation within age band
-                if max_age == 100:  # Handle very_old category
-                    return risk_factor * 100
-                age_range = max_age - min_age
-                position = (age_years - min_age) / age_range
-                return risk_factor * 100 * (0.5 + 0.5 * position)
+        return float(self._age_factor_vec(np.asarray(age_years, dtype=float)))
+        
+    def _age_factor_vec(self, ages: np.ndarray) -> np.ndarray:
+        """Calculate age-based risk factors (0-100 scale) for an array of ages."""
+        idx = np.digitize(ages, self._age_edges) - 1
+        in_band = (idx >= 0) & (idx < len(self._age_base))
+        idx = np.clip(idx, 0, len(self._age_base) - 1)
+        lo, hi, base = self._age_edges[idx], self._age_edges[idx + 1], self._age_base[idx]
+        
+        # Linear interpolation within age band; the open-ended very_old band is flat
+        position = (ages - lo) / (hi - lo)
+        factors = np.where(np.isinf(hi), base * 100, base * 100 * (0.5 + 0.5 * position))
         
         # Default for very old vessels
-        return 100.0
+        return np.where(in_band, factors, 100.0)
         
     def _calculate_history_factor(self, inspection_info: Dict) -> float:
         """Calculate historical defect-based risk factor."""
@@ -217,37 +497,10 @@ class RiskCalculator_Maritime:
         """Calculate MOU-based risk factor."""
         base_mou_risk = 50.0  # Default moderate risk
         
-        # Flag state risk modifier
-        flag_risk_modifiers = {
-            'Panama': 1.1,      # Higher risk due to flag of convenience
-            'Marshall Islands': 1.1,
-            'Korea': 0.9,       # Lower risk, good maritime administration
-            'Japan': 0.8,
-            'Norway': 0.8
-        }
-        
-        flag_modifier = flag_risk_modifiers.get(vessel_info['flag_state'], 1.0)
-        
-        # Vessel type risk modifier
-        type_risk_modifiers = {
-            'PC(T)C': 1.0,      # Standard risk
-            'Bulk': 0.9,        # Slightly lower risk based on fleet data
-            'Container': 0.85,
-            'Tanker': 1.2
-        }
-        
-        type_modifier = type_risk_modifiers.get(vessel_info['vessel_type'], 1.0)
-        
-        # Classification society modifier
-        class_risk_modifiers = {
-            'DNV': 0.9,         # Lower risk, good class society
-            'RINA': 1.0,
-            'KR': 0.9,          # Korean Register, good reputation
-            'ABS': 0.9,
-            'LR': 0.9
-        }
-        
-        class_modifier = class_risk_modifiers.get(vessel_info.get('classification_society', 'Unknown'), 1.0)
+        # Flag state, vessel type and classification society modifiers
+        flag_modifier = self.flag_risk_modifiers.get(vessel_info['flag_state'], 1.0)
+        type_modifier = self.type_risk_modifiers.get(vessel_info['vessel_type'], 1.0)
+        class_modifier = self.class_risk_modifiers.get(vessel_info.get('classification_society', 'Unknown'), 1.0)
         
         mou_score = base_mou_risk * flag_modifier * type_modifier * class_modifier
         
@@ -255,14 +508,7 @@ class RiskCalculator_Maritime:
         
     def _get_trend_modifier(self, trend: str) -> float:
         """Get performance trend modifier."""
-        trend_modifiers = {
-            'Excellent': 0.7,
-            'Improving': 0.8,
-            'Stable': 1.0,
-            'Deteriorating': 1.3,
-            'Critical': 1.5
-        }
-        return trend_modifiers.get(trend, 1.0)
+        return self.trend_modifiers.get(trend, 1.0)
         
     def _get_risk_category(self, risk_score: float) -> str:
         """Classify risk score into categories."""
@@ -275,50 +521,79 @@ class RiskCalculator_Maritime:
         else:
             return 'CRITICAL'
             
-    def generateRiskMatrix(self, vessels: List[str] = None) -> Dict:
+    def _categorize_vec(self, scores: np.ndarray) -> pd.Categorical:
+        """
+        Classify an array of risk scores into categories (same bounds as _get_risk_category).
+        The result is ordered, so .codes gives 0 LOW, 1 MEDIUM, 2 HIGH, 3 CRITICAL.
+        """
+        return pd.cut(scores, bins=[-np.inf, 25, 50, 75, np.inf],
+                      labels=self._RISK_CATEGORIES)
+        
+    def _score_vec(self, age: np.ndarray, history: np.ndarray, mou: np.ndarray) -> Tuple[np.ndarray, pd.Categorical]:
+        """Risk scores (A*0.4 + H*0.4 + M*0.2, clamped to 0-100) and their categories for arrays of factors."""
+        if _NUMBA_AVAILABLE:
+            # One parallel pass for the weighted sum, clamp and category code
+            scores = np.empty(len(age))
+            codes = np.empty(len(age), dtype=np.int8)
+            score_fleet(age, history, mou, scores, codes)
+            return scores, pd.Categorical.from_codes(codes, categories=self._RISK_CATEGORIES, ordered=True)
+            
+        scores = np.clip((age * 0.4) + (history * 0.4) + (mou * 0.2), 0, 100)
+        return scores, self._categorize_vec(scores)
+            
+    def generateRiskMatrix(self, vessels: List[str] = None, fleet_risks: List[Dict] = None) -> Dict:
         """
         Generate comprehensive 5x5 risk matrix with heatmap visualization.
         
+        Args:
+            vessels: Vessel names to include (default: all vessels with inspection data)
+            fleet_risks: Already computed calculateRiskScore results to bin directly;
+                takes precedence over vessels
+            
         Returns:
             Dict containing matrix data and visualization components
         """
-        if vessels is None:
-            # Use all vessels with inspection data
-            vessels = [v['vessel_name'] for v in self.inspection_data['vessel_performance']]
-            
-        # Calculate risk scores for all vessels
-        vessel_risks = []
-        for vessel_name in vessels:
-            risk_data = self.calculateRiskScore(vessel_name)
-            if 'error' not in risk_data:
-                vessel_risks.append(risk_data)
+        if fleet_risks is not None:
+            known = [r['vessel_name'] for r in fleet_risks]
+            risk_scores = np.array([r['risk_score'] for r in fleet_risks], dtype=float)
+        else:
+            if vessels is None:
+                # Use all vessels with inspection data
+                vessels = [v['vessel_name'] for v in self.inspection_data['vessel_performance']]
+                
+            # Look up precomputed scores; unknown vessels go through calculateRiskScore to report the error
+            known = []
+            for vessel_name in vessels:
+                if vessel_name in self._fleet_df.index:
+                    known.append(vessel_name)
+                else:
+                    self.calculateRiskScore(vessel_name)
+            risk_scores = self._fleet_df.loc[known, 'risk_score'].to_numpy(dtype=float)
                 
         # Create 5x5 risk matrix
         probability_levels = ['Very Low', 'Low', 'Medium', 'High', 'Very High']
         severity_levels = ['Insignificant', 'Minor', 'Moderate', 'Major', 'Catastrophic']
         
-        # Initialize matrix
-        risk_matrix = np.zeros((5, 5))
-        vessel_distribution = {}
+        # Map risk score to probability (based on historical performance) and
+        # severity (based on potential impact) for all vessels at once.
+        # calculateRiskScore's vessel_info has never carried dwt, so severity
+        # has always been adjusted as for dwt=0; keep that here.
+        prob_index = np.minimum(4, (risk_scores / 20).astype(int))
+        severity_index = self._severity_vec(np.zeros(len(known)), risk_scores)
+        rows = 4 - severity_index
         
-        for i in range(5):
-            for j in range(5):
-                vessel_distribution[(i, j)] = []
-                
-        # Distribute vessels into matrix cells
-        for risk_data in vessel_risks:
-            risk_score = risk_data['risk_score']
-            vessel_name = risk_data['vessel_name']
-            
-            # Map risk score to probability (based on historical performance)
-            prob_index = min(4, int(risk_score / 20))
-            
-            # Map risk score to severity (based on potential impact)
-            vessel_info = risk_data['vessel_info']
-            severity_index = self._calculate_severity_index(vessel_info, risk_score)
-            
-            risk_matrix[4-severity_index, prob_index] += 1
-            vessel_distribution[(4-severity_index, prob_index)].append(vessel_name)
+        risk_matrix = np.zeros((5, 5))
+        np.add.at(risk_matrix, (rows, prob_index), 1)
+        
+        # Group vessel names by cell with one stable sort; only occupied cells get an entry,
+        # so look cells up with vessel_distribution.get((i, j), [])
+        cells = rows * 5 + prob_index
+        order = np.argsort(cells, kind='stable')
+        occupied, starts = np.unique(cells[order], return_index=True)
+        groups = np.split(np.asarray(known, dtype=object)[order], starts[1:])
+        vessel_distribution = {
+            divmod(cell, 5): group.tolist() for cell, group in zip(occupied.tolist(), groups)
+        }
             
         # Calculate risk levels (1-25)
         risk_levels = np.zeros((5, 5))
@@ -333,7 +608,7 @@ class RiskCalculator_Maritime:
             'probability_levels': probability_levels,
             'severity_levels': severity_levels,
             'vessel_distribution': vessel_distribution,
-            'total_vessels': len(vessel_risks),
+            'total_vessels': len(known),
             'generated_at': datetime.now().isoformat()
         }
         
@@ -341,52 +616,88 @@ class RiskCalculator_Maritime:
         
     def _calculate_severity_index(self, vessel_info: Dict, risk_score: float) -> int:
         """Calculate severity index based on vessel characteristics and risk."""
-        base_severity = min(4, int(risk_score / 20))
+        return int(self._severity_vec(np.asarray(vessel_info.get('dwt', 0), dtype=float), np.asarray(risk_score, dtype=float)))
         
-        # Adjust based on vessel size (DWT)
-        dwt = vessel_info.get('dwt', 0)
-        if dwt > 100000:  # Large vessels
-            base_severity = min(4, base_severity + 1)
-        elif dwt < 20000:  # Small vessels
-            base_severity = max(0, base_severity - 1)
-            
-        return base_severity
+    def _severity_vec(self, dwt: np.ndarray, risk_scores: np.ndarray) -> np.ndarray:
+        """Severity indices for arrays of DWT and risk scores."""
+        base_severity = np.clip((risk_scores / 20).astype(int), 0, 4)
         
-    def visualizeRiskMatrix(self, save_path: str = None) -> go.Figure:
+        # Adjust based on vessel size (DWT): large vessels +1, small vessels -1
+        bump = np.select([dwt > 100000, dwt < 20000], [1, -1], default=0)
+        return np.clip(base_severity + bump, 0, 4)
+        
+    def visualizeRiskMatrix(self, save_path: str = None) -> "go.Figure":
         """
         Create interactive risk matrix heatmap visualization.
         
+        The figure is cached by matrix content, so an unchanged matrix returns the
+        same figure object; copy it before modifying.
+        
         Returns:
             Plotly figure object
         """
         if not self.risk_matrix:
             self.generateRiskMatrix()
             
-        # Create heatmap data
-        z_data = self.risk_matrix['risk_levels']
-        hover_text = []
+        fig_key = self._matrix_key(self.risk_matrix)
+        fig = self._fig_cache.get(fig_key)
+        if fig is None:
+            fig = self._build_matrix_figure()
+            self._fig_cache[fig_key] = fig
+            
+        if save_path:
+            fig.write_html(save_path)
+            
+        return fig
         
-        for i in range(5):
-            hover_row = []
-            for j in range(5):
-                vessel_count = int(self.risk_matrix['matrix'][i][j])
-                risk_level = int(z_data[i][j])
-                vessels = self.risk_matrix['vessel_distribution'].get((i, j), [])
-                
-                hover_info = f"""
-                Risk Level: {risk_level}
-                Vessel Count: {vessel_count}
-                Severity: {self.risk_matrix['severity_levels'][i]}
-                Probability: {self.risk_matrix['probability_levels'][j]}
-                """
+    @staticmethod
+    def _matrix_key(risk_matrix: Dict) -> str:
+        """Content hash of a risk matrix: counts, risk levels and the vessels shown in hover text."""
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update(np.asarray(risk_matrix['matrix'], dtype=float).tobytes())
+        digest.update(np.asarray(risk_matrix['risk_levels'], dtype=float).tobytes())
+        digest.update(repr(risk_matrix['vessel_distribution']).encode())
+        return digest.hexdigest()
+        
+    @staticmethod
+    def _hover_text(risk_level: int, vessel_count: int, severity: str, probability: str,
+                    vessels: List[str]) -> str:
+        """Hover text for one risk matrix cell, listing up to three of its vessels."""
+        indent = ' ' * 16
+        hover_info = (f"\n{indent}Risk Level: {risk_level}"
+                      f"\n{indent}Vessel Count: {vessel_count}"
+                      f"\n{indent}Severity: {severity}"
+                      f"\n{indent}Probability: {probability}"
+                      f"\n{indent}")
+        
+        if vessels:
+            hover_info += f"\nVessels: {', '.join(vessels[:3])}"
+            if len(vessels) > 3:
+                hover_info += f" (+{len(vessels)-3} more)"
                 
-                if vessels:
-                    hover_info += f"\nVessels: {', '.join(vessels[:3])}"
-                    if len(vessels) > 3:
-                        hover_info += f" (+{len(vessels)-3} more)"
-                        
-                hover_row.append(hover_info)
-            hover_text.append(hover_row)
+        return hover_info
+        
+    def _build_matrix_figure(self) -> "go.Figure":
+        """Build the heatmap figure for the current risk matrix."""
+        import plotly.graph_objects as go
+        
+        # Create heatmap data: cell values and their severity/probability labels as grids
+        z_data = self.risk_matrix['risk_levels']
+        levels = np.asarray(z_data).astype(int)
+        counts = np.asarray(self.risk_matrix['matrix']).astype(int)
+        prob_grid, sev_grid = np.meshgrid(self.risk_matrix['probability_levels'],
+                                          self.risk_matrix['severity_levels'])
+        rows, cols = np.indices(levels.shape)
+        distribution = self.risk_matrix['vessel_distribution']
+        
+        hover_text = np.vectorize(
+            lambda level, count, severity, probability, i, j: self._hover_text(
+                level, count, severity, probability, distribution.get((i, j), [])),
+            otypes=[object]
+        )(levels, counts, sev_grid, prob_grid, rows, cols).tolist()
+        cell_text = np.vectorize(
+            lambda level, count: f"Level {level}<br>{count} vessels", otypes=[object]
+        )(levels, counts).tolist()
             
         # Create color scale
         colors = [
@@ -401,8 +712,7 @@ class RiskCalculator_Maritime:
             z=z_data,
             x=self.risk_matrix['probability_levels'],
             y=self.risk_matrix['severity_levels'][::-1],  # Reverse for proper display
-            text=[[f"Level {int(z_data[i][j])}<br>{int(self.risk_matrix['matrix'][i][j])} vessels" 
-                   for j in range(5)] for i in range(5)],
+            text=cell_text,
             texttemplate="%{text}",
             textfont={"size": 10, "color": "white"},
             hovertext=hover_text,
@@ -429,9 +739,6 @@ class RiskCalculator_Maritime:
             plot_bgcolor='white'
         )
         
-        if save_path:
-            fig.write_html(save_path)
-            
         return fig
         
     def simulateScenario(self, scenario_name: str, parameters: Dict) -> Dict:
@@ -457,105 +764,63 @@ class RiskCalculator_Maritime:
         try:
             vessels = parameters.get('vessels', [v['vessel_name'] for v in self.inspection_data['vessel_performance']])
             
-            # Baseline risk scores
-            baseline_scores = {}
+            # Baseline factors come from the fleet frame; unknown vessels go through
+            # calculateRiskScore to report the error and are left out of the analysis
+            known = []
             for vessel in vessels:
-                baseline_scores[vessel] = self.calculateRiskScore(vessel)
-                
-            # Apply scenario modifications
-            modified_scores = {}
+                if vessel in self._fleet_df.index:
+                    known.append(vessel)
+                else:
+                    self.calculateRiskScore(vessel)
+            baseline = self._fleet_df.loc[known]
             
+            a_factor = baseline['age_factor'].to_numpy()
+            h_factor = baseline['history_factor'].to_numpy()
+            m_factor = baseline['mou_factor'].to_numpy()
+            
+            # Apply scenario modifications
             if scenario_name == 'training_impact':
                 # Reduce historical defect factor by specified percentage
                 reduction_pct = parameters.get('defect_reduction', 20) / 100.0
+                h_factor = h_factor * (1 - reduction_pct)
                 
-                for vessel in vessels:
-                    baseline = baseline_scores[vessel]
-                    if 'error' not in baseline:
-                        # Calculate modified history factor
-                        original_h = baseline['factor_breakdown']['history_factor']
-                        modified_h = original_h * (1 - reduction_pct)
-                        
-                        # Recalculate risk score
-                        a_factor = baseline['factor_breakdown']['age_factor']
-                        m_factor = baseline['factor_breakdown']['mou_factor']
-                        
-                        new_risk_score = (a_factor * 0.4) + (modified_h * 0.4) + (m_factor * 0.2)
-                        new_risk_score = max(0, min(100, new_risk_score))
-                        
-                        modified_scores[vessel] = {
-                            'risk_score': new_risk_score,
-                            'risk_category': self._get_risk_category(new_risk_score),
-                            'factors': {
-                                'age_factor': a_factor,
-                                'history_factor': modified_h,
-                                'mou_factor': m_factor
-                            }
-                        }
-                        
             elif scenario_name == 'maintenance_improvement':
                 # Improve age-related risk through better maintenance
                 age_improvement = parameters.get('age_risk_reduction', 15) / 100.0
+                a_factor = a_factor * (1 - age_improvement)
                 
-                for vessel in vessels:
-                    baseline = baseline_scores[vessel]
-                    if 'error' not in baseline:
-                        # Calculate modified age factor
-                        original_a = baseline['factor_breakdown']['age_factor']
-                        modified_a = original_a * (1 - age_improvement)
-                        
-                        # Recalculate risk score
-                        h_factor = baseline['factor_breakdown']['history_factor']
-                        m_factor = baseline['factor_breakdown']['mou_factor']
-                        
-                        new_risk_score = (modified_a * 0.4) + (h_factor * 0.4) + (m_factor * 0.2)
-                        new_risk_score = max(0, min(100, new_risk_score))
-                        
-                        modified_scores[vessel] = {
-                            'risk_score': new_risk_score,
-                            'risk_category': self._get_risk_category(new_risk_score),
-                            'factors': {
-                                'age_factor': modified_a,
-                                'history_factor': h_factor,
-                                'mou_factor': m_factor
-                            }
-                        }
-                        
-            # Calculate impact analysis
-            total_reduction = 0
-            vessels_improved = 0
-            category_changes = {'improved': 0, 'unchanged': 0, 'worsened': 0}
+            else:
+                baseline = baseline.iloc[:0]
+                a_factor, h_factor, m_factor = a_factor[:0], h_factor[:0], m_factor[:0]
+                
+            # Recalculate risk scores and impact analysis for all vessels at once
+            modified_score, modified_cat = self._score_vec(a_factor, h_factor, m_factor)
+            baseline_cat = self._categorize_vec(baseline['risk'].to_numpy())
+            analysis = pd.DataFrame({
+                'vessel_name': baseline.index,
+                'baseline_score': baseline['risk_score'].to_numpy(),
+                'modified_score': modified_score,
+                'risk_reduction': baseline['risk_score'].to_numpy() - modified_score,
+                'baseline_category': baseline['risk_category'].to_numpy(),
+                'modified_category': modified_cat.astype(str)
+            })
             
-            for vessel in vessels:
-                if vessel in baseline_scores and vessel in modified_scores:
-                    baseline_score = baseline_scores[vessel]['risk_score']
-                    modified_score = modified_scores[vessel]['risk_score']
-                    
-                    reduction = baseline_score - modified_score
-                    total_reduction += reduction
-                    
-                    if reduction > 0:
-                        vessels_improved += 1
-                        
-                    baseline_cat = baseline_scores[vessel]['risk_category']
-                    modified_cat = modified_scores[vessel]['risk_category']
-                    
-                    if modified_cat < baseline_cat:  # Improved category
-                        category_changes['improved'] += 1
-                    elif modified_cat == baseline_cat:
-                        category_changes['unchanged'] += 1
-                    else:
-                        category_changes['worsened'] += 1
-                        
-                    # Store vessel analysis
-                    scenario_results['vessels_analyzed'].append({
-                        'vessel_name': vessel,
-                        'baseline_score': baseline_score,
-                        'modified_score': modified_score,
-                        'risk_reduction': reduction,
-                        'baseline_category': baseline_cat,
-                        'modified_category': modified_cat
-                    })
+            total_reduction = float(analysis['risk_reduction'].sum())
+            vessels_improved = int((analysis['risk_reduction'] > 0).sum())
+            
+            # Compare ordered category codes (LOW < MEDIUM < HIGH < CRITICAL), not label strings
+            baseline_codes = baseline_cat.codes
+            modified_codes = modified_cat.codes
+            improved = int((modified_codes < baseline_codes).sum())
+            worsened = int((modified_codes > baseline_codes).sum())
+            category_changes = {
+                'improved': improved,
+                'unchanged': len(modified_codes) - improved - worsened,
+                'worsened': worsened
+            }
+            
+            # Store vessel analysis
+            scenario_results['vessels_analyzed'] = analysis.to_dict('records')
                     
             # Calculate summary statistics
             avg_reduction = total_reduction / len(vessels) if vessels else 0
@@ -688,24 +953,13 @@ class RiskCalculator_Maritime:
         vessel_type = vessel_info['vessel_type']
         vessel_age = vessel_info['age_years']
         
-        # Find comparable vessels
-        peer_risks = []
-        for vessel in self.inspection_data['vessel_performance']:
-            if vessel['vessel_name'] != vessel_name:
-                peer_vessel_info = None
-                for v in self.vessel_data['vessels']:
-                    if v['vessel_name'] == vessel['vessel_name']:
-                        peer_vessel_info = v
-                        break
-                        
-                if peer_vessel_info and peer_vessel_info['vessel_type'] == vessel_type:
-                    peer_risk = self.calculateRiskScore(vessel['vessel_name'])
-                    if 'error' not in peer_risk:
-                        peer_risks.append(peer_risk['risk_score'])
+        # Comparable vessels: same type, excluding the vessel itself
+        peer_names, peer_scores = self._peer_groups.get(vessel_type, (np.empty(0, dtype=object), np.empty(0)))
+        peer_risks = peer_scores[peer_names != vessel_name]
                         
-        if peer_risks:
-            avg_peer_risk = np.mean(peer_risks)
-            percentile = (sum(1 for r in peer_risks if r > risk_data['risk_score']) / len(peer_risks)) * 100
+        if peer_risks.size:
+            avg_peer_risk = float(peer_risks.mean())
+            percentile = float((peer_risks > risk_data['risk_score']).mean() * 100)
             
             return {
                 'peer_count': len(peer_risks),
@@ -719,11 +973,7 @@ class RiskCalculator_Maritime:
     def _predict_risk_trend(self, vessel_name: str) -> Dict:
         """Predict future risk trend for vessel."""
         # Find vessel performance data
-        vessel_perf = None
-        for v in self.inspection_data['vessel_performance']:
-            if v['vessel_name'] == vessel_name:
-                vessel_perf = v
-                break
+        vessel_perf = self._perf_by_name.get(vessel_name)
                 
         if not vessel_perf:
             return {'trend': 'Unknown', 'confidence': 'Low'}
@@ -742,11 +992,7 @@ class RiskCalculator_Maritime:
         prediction = trend_mapping.get(trend, {'trend': 'Unknown', 'confidence': 'Low'})
         
         # Add time-based aging factor
-        vessel_info = None
-        for v in self.vessel_data['vessels']:
-            if v['vessel_name'] == vessel_name:
-                vessel_info = v
-                break
+        vessel_info = self._vessel_by_name.get(vessel_name)
                 
         if vessel_info and vessel_info['age_years'] > 25:
             if prediction['trend'] in ['Stable', 'Decreasing']:
@@ -760,28 +1006,32 @@ class RiskCalculator_Maritime:
         print("🔄 Generating comprehensive fleet risk assessment...")
         
         # Calculate risk scores for all vessels
-        fleet_risks = []
-        for vessel in self.inspection_data['vessel_performance']:
-            risk_data = self.calculateRiskScore(vessel['vessel_name'])
-            if 'error' not in risk_data:
-                fleet_risks.append(risk_data)
+        fleet_risks = self.calculateRiskScoresVectorized()
                 
-        # Fleet statistics
+        # Fleet statistics from score and category arrays
         total_vessels = len(fleet_risks)
-        avg_fleet_risk = np.mean([v['risk_score'] for v in fleet_risks])
-        
+        scores = [v['risk_score'] for v in fleet_risks]
+        risk_array = np.array(scores, dtype=float)
+        total_risk = sum(scores, 0.0)
+        high_risk_count = int(np.count_nonzero(risk_array > 50))
+        critical_risk_count = int(np.count_nonzero(risk_array > 75))
+        
+        categories, counts = np.unique(np.array([v['risk_category'] for v in fleet_risks], dtype=str),
+                                       return_counts=True)
         risk_distribution = {'LOW': 0, 'MEDIUM': 0, 'HIGH': 0, 'CRITICAL': 0}
-        for vessel in fleet_risks:
-            risk_distribution[vessel['risk_category']] += 1
-            
-        # Top risk vessels
-        top_risk_vessels = sorted(fleet_risks, key=lambda x: x['risk_score'], reverse=True)[:5]
+        risk_distribution.update(zip(categories.tolist(), counts.tolist()))
+                
+        avg_fleet_risk = total_risk / total_vessels if total_vessels else 0
         
-        # Generate risk matrix
-        risk_matrix = self.generateRiskMatrix()
+        # Top risk vessels: O(N log 5), and stable like sorted(...)[:5], so earlier vessels win ties
+        top_risk_vessels = heapq.nlargest(5, fleet_risks, key=lambda x: x['risk_score'])
+        
+        # Generate risk matrix; cells above risk level 15 count as high risk
+        risk_matrix = self.generateRiskMatrix(fleet_risks=fleet_risks)
+        high_risk_mask = np.asarray(risk_matrix['risk_levels']) > 15
         
         # Fleet recommendations
-        fleet_recommendations = self._generate_fleet_recommendations(fleet_risks)
+        fleet_recommendations = self._generate_fleet_recommendations(fleet_risks, critical_risk_count)
         
         report = {
             'report_title': 'Maritime Fleet Risk Assessment Report',
@@ -790,41 +1040,45 @@ class RiskCalculator_Maritime:
                 'total_vessels': total_vessels,
                 'average_risk_score': round(avg_fleet_risk, 1),
                 'risk_distribution': risk_distribution,
-                'high_risk_vessels': len([v for v in fleet_risks if v['risk_score'] > 50]),
-                'critical_risk_vessels': len([v for v in fleet_risks if v['risk_score'] > 75])
+                'high_risk_vessels': high_risk_count,
+                'critical_risk_vessels': critical_risk_count
             },
             'top_risk_vessels': [
                 {
                     'vessel_name': v['vessel_name'],
                     'risk_score': v['risk_score'],
                     'risk_category': v['risk_category'],
-                    'primary_risk_factor': max(v['factor_breakdown'], key=v['factor_breakdown'].get)
+                    'primary_risk_factor': v['primary_risk_factor']
                 } for v in top_risk_vessels
             ],
             'risk_matrix_summary': {
                 'total_vessels_in_matrix': risk_matrix['total_vessels'],
-                'high_risk_cells': sum(1 for i in range(5) for j in range(5) if risk_matrix['risk_levels'][i][j] > 15),
-                'vessels_in_high_risk': sum(risk_matrix['matrix'][i][j] for i in range(5) for j in range(5) if risk_matrix['risk_levels'][i][j] > 15)
+                'high_risk_cells': int(high_risk_mask.sum()),
+                'vessels_in_high_risk': float(np.asarray(risk_matrix['matrix'])[high_risk_mask].sum())
             },
             'fleet_recommendations': fleet_recommendations,
             'vessel_details': fleet_risks
         }
         
         if save_path:
-            with open(save_path, 'w') as f:
-                json.dump(report, f, indent=2)
+            if orjson is not None:
+                with open(save_path, 'wb') as f:
+                    f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+            else:
+                with open(save_path, 'w') as f:
+                    json.dump(report, f, indent=2)
             print(f"✅ Fleet report saved to {save_path}")
             
         return report
         
-    def _generate_fleet_recommendations(self, fleet_risks: List[Dict]) -> List[Dict]:
-        """Generate fleet-level risk management recommendations."""
+    def _generate_fleet_recommendations(self, fleet_risks: List[Dict], critical_risk_count: int) -> List[Dict]:
+        """
+        Generate fleet-level risk management recommendations.
+        critical_risk_count (vessels scoring above 75) comes from generateFleetReport's statistics pass.
+        """
         recommendations = []
         
         # Analyze overall risk patterns
-        high_risk_count = len([v for v in fleet_risks if v['risk_score'] > 50])
-        critical_risk_count = len([v for v in fleet_risks if v['risk_score'] > 75])
-        
         if critical_risk_count > 0:
             recommendations.append({
                 'priority': 'CRITICAL',
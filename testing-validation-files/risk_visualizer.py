@@ -4,6 +4,8 @@ Creates visual reports and charts for maritime risk assessment data
 """
 
 import json
+import matplotlib
+matplotlib.use('Agg')  # PNG output only; skip GUI backend startup
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 import numpy as np
@@ -11,13 +13,34 @@ import seaborn as sns
 from datetime import datetime
 import pandas as pd
 
+plt.ioff()
+
+# Colors for risk categories
+CATEGORY_COLORS = {
+    'LOW': '#28a745',      # Green
+    'MEDIUM': '#ffc107',   # Yellow
+    'HIGH': '#fd7e14',     # Orange
+    'CRITICAL': '#dc3545'  # Red
+}
+
+# Colors for vessel types, with a fallback for types not listed
+VESSEL_TYPE_COLORS = {'PC(T)C': '#ff6b6b', 'Bulk': '#4ecdc4'}
+DEFAULT_VESSEL_TYPE_COLOR = '#45b7d1'
+
 class RiskVisualizer:
     """Creates visualizations for maritime risk assessment data."""
     
-    def __init__(self, report_path: str = "fleet_risk_assessment.json"):
-        """Initialize with risk assessment report data."""
+    def __init__(self, report_path: str = "fleet_risk_assessment.json", dpi: int = 120):
+        """
+        Initialize with risk assessment report data.
+        dpi sets the PNG resolution of the individual charts; raise it for report-grade output.
+        """
         self.report_path = report_path
+        self.dpi = dpi
         self.report_data = None
+        self._vessels_df = None
+        # Figure reused across charts while generate_all_visualizations runs
+        self._fig = None
         self._load_report()
         
     def _load_report(self):
@@ -25,10 +48,41 @@ class RiskVisualizer:
         try:
             with open(self.report_path, 'r') as f:
                 self.report_data = json.load(f)
+            self._vessels_df = self._build_vessels_frame(self.report_data['vessel_details'])
             print(f"SUCCESS: Loaded risk assessment report from {self.report_path}")
         except Exception as e:
             print(f"ERROR: Failed to load report: {str(e)}")
             
+    @staticmethod
+    def _build_vessels_frame(vessel_details: list) -> pd.DataFrame:
+        """Flatten per-vessel report entries into one row per vessel, shared by the chart methods."""
+        return pd.DataFrame({
+            'vessel_name': [v['vessel_name'] for v in vessel_details],
+            'risk_score': [v['risk_score'] for v in vessel_details],
+            'risk_category': [v['risk_category'] for v in vessel_details],
+            'age_factor': [v['factor_breakdown']['age_factor'] for v in vessel_details],
+            'history_factor': [v['factor_breakdown']['history_factor'] for v in vessel_details],
+            'mou_factor': [v['factor_breakdown']['mou_factor'] for v in vessel_details],
+            'age_years': [v['vessel_info']['age_years'] for v in vessel_details],
+            'vessel_type': [v['vessel_info']['vessel_type'] for v in vessel_details]
+        })
+        
+    def _new_figure(self, figsize: tuple):
+        """
+        Figure for the next chart, made current for pyplot calls: the shared figure, cleared
+        and resized, during generate_all_visualizations, otherwise a new figure.
+        """
+        if self._fig is None:
+            return plt.figure(figsize=figsize)
+        self._fig.clear()
+        self._fig.set_size_inches(figsize)
+        return plt.figure(self._fig.number)
+        
+    def _close_figure(self):
+        """Close the current chart's figure unless it is the shared one."""
+        if plt.gcf() is not self._fig:
+            plt.close()
+            
     def create_risk_distribution_chart(self, save_path: str = "risk_distribution.png"):
         """Create risk distribution pie chart."""
         if not self.report_data:
@@ -37,23 +91,15 @@ class RiskVisualizer:
             
         risk_dist = self.report_data['fleet_overview']['risk_distribution']
         
-        # Colors for risk categories
-        colors = {
-            'LOW': '#28a745',      # Green
-            'MEDIUM': '#ffc107',   # Yellow
-            'HIGH': '#fd7e14',     # Orange
-            'CRITICAL': '#dc3545'  # Red
-        }
-        
         # Filter out zero values
         filtered_dist = {k: v for k, v in risk_dist.items() if v > 0}
         
         labels = list(filtered_dist.keys())
         sizes = list(filtered_dist.values())
-        chart_colors = [colors[label] for label in labels]
+        chart_colors = [CATEGORY_COLORS[label] for label in labels]
         
         # Create pie chart
-        plt.figure(figsize=(10, 8))
+        self._new_figure((10, 8))
         wedges, texts, autotexts = plt.pie(sizes, labels=labels, colors=chart_colors, 
                                           autopct='%1.1f%%', startangle=90, textprops={'fontsize': 12})
         
@@ -64,8 +110,8 @@ class RiskVisualizer:
         plt.legend(wedges, legend_labels, title="Risk Categories", loc="center left", bbox_to_anchor=(1, 0, 0.5, 1))
         
         plt.tight_layout()
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        plt.close()
+        plt.savefig(save_path, dpi=self.dpi, bbox_inches='tight')
+        self._close_figure()
         
         print(f"SUCCESS: Risk distribution chart saved as {save_path}")
         
@@ -80,31 +126,22 @@ class RiskVisualizer:
         risk_levels = np.array(risk_matrix['risk_levels'])
         
         # Create figure
-        fig, ax = plt.subplots(figsize=(12, 10))
-        
-        # Create heatmap
-        im = ax.imshow(matrix_data, cmap='RdYlGn_r', aspect='equal')
-        
-        # Set ticks and labels
-        ax.set_xticks(np.arange(5))
-        ax.set_yticks(np.arange(5))
-        ax.set_xticklabels(risk_matrix['probability_levels'], fontsize=12)
-        ax.set_yticklabels(risk_matrix['severity_levels'], fontsize=12)
-        
-        # Rotate the tick labels for better display
-        plt.setp(ax.get_xticklabels(), rotation=45, ha="right", rotation_mode="anchor")
-        
-        # Add text annotations
-        for i in range(5):
-            for j in range(5):
-                vessel_count = int(matrix_data[i, j])
-                risk_level = int(risk_levels[i, j])
-                
-                # Color text based on background
-                text_color = 'white' if vessel_count > 0 else 'black'
-                
-                text = ax.text(j, i, f'{vessel_count} vessels\nRisk Level: {risk_level}', 
-                              ha="center", va="center", color=text_color, fontsize=10, fontweight='bold')
+        fig = self._new_figure((12, 10))
+        ax = fig.add_subplot()
+        
+        # Create heatmap; seaborn places all 25 cell annotations in one call
+        vessel_counts = matrix_data.astype(int)
+        annot = np.array([f'{count} vessels\nRisk Level: {level}'
+                          for count, level in zip(vessel_counts.ravel(), risk_levels.astype(int).ravel())],
+                         dtype=object).reshape(vessel_counts.shape)
+        sns.heatmap(matrix_data, annot=annot, fmt='', cmap='RdYlGn_r', square=True, ax=ax,
+                    xticklabels=risk_matrix['probability_levels'], yticklabels=risk_matrix['severity_levels'],
+                    annot_kws={'fontsize': 10, 'fontweight': 'bold'}, cbar_kws={'shrink': 0.8},
+                    rasterized=True)
+        
+        # Tick labels; rotate the probability labels for better display
+        plt.setp(ax.get_xticklabels(), fontsize=12, rotation=45, ha="right", rotation_mode="anchor")
+        plt.setp(ax.get_yticklabels(), fontsize=12, rotation=0)
         
         # Labels and title
         ax.set_xlabel('Probability →', fontsize=14, fontweight='bold')
@@ -112,13 +149,12 @@ class RiskVisualizer:
         ax.set_title('5×5 Maritime Risk Assessment Matrix\nVessel Distribution by Risk Level', 
                     fontsize=16, fontweight='bold', pad=20)
         
-        # Add colorbar
-        cbar = plt.colorbar(im, ax=ax, shrink=0.8)
-        cbar.set_label('Number of Vessels', fontsize=12, fontweight='bold')
+        # Colorbar label
+        ax.collections[0].colorbar.set_label('Number of Vessels', fontsize=12, fontweight='bold')
         
         plt.tight_layout()
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        plt.close()
+        plt.savefig(save_path, dpi=self.dpi, bbox_inches='tight')
+        self._close_figure()
         
         print(f"SUCCESS: Risk matrix heatmap saved as {save_path}")
         
@@ -128,27 +164,19 @@ class RiskVisualizer:
             print("ERROR: No report data available")
             return
             
-        vessels = self.report_data['vessel_details']
+        df = self._vessels_df
         
-        # Sort vessels by risk score
-        sorted_vessels = sorted(vessels, key=lambda x: x['risk_score'], reverse=True)
+        # Sort vessels by risk score (stable, so ties keep report order)
+        sorted_vessels = df.iloc[np.argsort(-df['risk_score'].to_numpy(), kind='stable')]
         
-        vessel_names = [v['vessel_name'] for v in sorted_vessels]
-        risk_scores = [v['risk_score'] for v in sorted_vessels]
-        risk_categories = [v['risk_category'] for v in sorted_vessels]
+        vessel_names = sorted_vessels['vessel_name'].tolist()
+        risk_scores = sorted_vessels['risk_score'].to_numpy()
         
         # Color mapping
-        color_map = {
-            'LOW': '#28a745',
-            'MEDIUM': '#ffc107', 
-            'HIGH': '#fd7e14',
-            'CRITICAL': '#dc3545'
-        }
-        
-        colors = [color_map[cat] for cat in risk_categories]
+        colors = sorted_vessels['risk_category'].map(CATEGORY_COLORS).tolist()
         
         # Create horizontal bar chart
-        plt.figure(figsize=(14, 10))
+        self._new_figure((14, 10))
         bars = plt.barh(vessel_names, risk_scores, color=colors, alpha=0.8, edgecolor='black', linewidth=1)
         
         # Add risk score labels on bars
@@ -172,8 +200,8 @@ class RiskVisualizer:
         plt.legend(loc='lower right')
         plt.tight_layout()
         
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        plt.close()
+        plt.savefig(save_path, dpi=self.dpi, bbox_inches='tight')
+        self._close_figure()
         
         print(f"SUCCESS: Vessel risk comparison chart saved as {save_path}")
         
@@ -183,16 +211,17 @@ class RiskVisualizer:
             print("ERROR: No report data available")
             return
             
-        vessels = self.report_data['vessel_details']
+        df = self._vessels_df
         
         # Extract factor data
-        vessel_names = [v['vessel_name'] for v in vessels]
-        age_factors = [v['factor_breakdown']['age_factor'] for v in vessels]
-        history_factors = [v['factor_breakdown']['history_factor'] for v in vessels]
-        mou_factors = [v['factor_breakdown']['mou_factor'] for v in vessels]
+        vessel_names = df['vessel_name'].tolist()
+        age_factors = df['age_factor'].to_numpy()
+        history_factors = df['history_factor'].to_numpy()
+        mou_factors = df['mou_factor'].to_numpy()
         
         # Create stacked bar chart
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(16, 12))
+        fig = self._new_figure((16, 12))
+        ax1, ax2 = fig.subplots(2, 1)
         
         # Top chart: Stacked factors
         x = np.arange(len(vessel_names))
@@ -201,7 +230,7 @@ class RiskVisualizer:
         bars1 = ax1.bar(x, age_factors, width, label='Age Factor (40%)', color='#ff6b6b', alpha=0.8)
         bars2 = ax1.bar(x, history_factors, width, bottom=age_factors, label='History Factor (40%)', color='#4ecdc4', alpha=0.8)
         
-        bottom_combined = np.array(age_factors) + np.array(history_factors)
+        bottom_combined = age_factors + history_factors
         bars3 = ax1.bar(x, mou_factors, width, bottom=bottom_combined, label='MOU Factor (20%)', color='#45b7d1', alpha=0.8)
         
         ax1.set_xlabel('Vessels', fontsize=12, fontweight='bold')
@@ -231,8 +260,8 @@ class RiskVisualizer:
         ax2.set_ylim(0, 100)
         
         plt.tight_layout()
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        plt.close()
+        plt.savefig(save_path, dpi=self.dpi, bbox_inches='tight')
+        self._close_figure()
         
         print(f"SUCCESS: Risk factor analysis chart saved as {save_path}")
         
@@ -242,19 +271,20 @@ class RiskVisualizer:
             print("ERROR: No report data available")
             return
             
-        vessels = self.report_data['vessel_details']
+        df = self._vessels_df
         
-        ages = [v['vessel_info']['age_years'] for v in vessels]
-        risk_scores = [v['risk_score'] for v in vessels]
-        vessel_names = [v['vessel_name'] for v in vessels]
-        vessel_types = [v['vessel_info']['vessel_type'] for v in vessels]
+        ages = df['age_years'].to_numpy(dtype=float)
+        risk_scores = df['risk_score'].to_numpy(dtype=float)
+        vessel_names = df['vessel_name'].tolist()
         
         # Create scatter plot
-        plt.figure(figsize=(12, 8))
+        self._new_figure((12, 8))
         
-        # Color by vessel type
-        type_colors = {'PC(T)C': '#ff6b6b', 'Bulk': '#4ecdc4'}
-        colors = [type_colors.get(vt, '#45b7d1') for vt in vessel_types]
+        # Color by vessel type: category code per type, -1 for types without a listed color
+        type_codes = pd.Index(list(VESSEL_TYPE_COLORS)).get_indexer(df['vessel_type'])
+        palette = np.array(list(VESSEL_TYPE_COLORS.values()))
+        colors = np.where(type_codes >= 0, palette[np.clip(type_codes, 0, len(palette) - 1)],
+                          DEFAULT_VESSEL_TYPE_COLOR).tolist()
         
         scatter = plt.scatter(ages, risk_scores, c=colors, s=100, alpha=0.7, edgecolors='black', linewidth=1)
         
@@ -262,10 +292,11 @@ class RiskVisualizer:
         for i, name in enumerate(vessel_names):
             plt.annotate(name, (ages[i], risk_scores[i]), xytext=(5, 5), textcoords='offset points', fontsize=9)
         
-        # Add trend line
+        # Add trend line across the age range; ages are unsorted, so plot the endpoints only
         z = np.polyfit(ages, risk_scores, 1)
         p = np.poly1d(z)
-        plt.plot(ages, p(ages), "r--", alpha=0.8, linewidth=2, label=f'Trend Line (slope: {z[0]:.2f})')
+        trend_x = np.array([ages.min(), ages.max()])
+        plt.plot(trend_x, p(trend_x), "r--", alpha=0.8, linewidth=2, label=f'Trend Line (slope: {z[0]:.2f})')
         
         plt.xlabel('Vessel Age (years)', fontsize=14, fontweight='bold')
         plt.ylabel('Risk Score', fontsize=14, fontweight='bold')
@@ -273,7 +304,7 @@ class RiskVisualizer:
                  fontsize=16, fontweight='bold', pad=20)
         
         plt.grid(True, alpha=0.3)
-        plt.legend(['Trend Line'] + [f'{vt} Vessels' for vt in type_colors.keys()], 
+        plt.legend(['Trend Line'] + [f'{vt} Vessels' for vt in VESSEL_TYPE_COLORS], 
                   loc='upper left')
         
         # Add risk zones
@@ -284,8 +315,8 @@ class RiskVisualizer:
         
         plt.ylim(0, 100)
         plt.tight_layout()
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        plt.close()
+        plt.savefig(save_path, dpi=self.dpi, bbox_inches='tight')
+        self._close_figure()
         
         print(f"SUCCESS: Age-risk correlation chart saved as {save_path}")
         
@@ -296,7 +327,7 @@ class RiskVisualizer:
             return
             
         # Create subplot layout
-        fig = plt.figure(figsize=(20, 16))
+        fig = self._new_figure((20, 16))
         gs = fig.add_gridspec(3, 3, hspace=0.3, wspace=0.3)
         
         # 1. Fleet Overview (top-left)
@@ -324,11 +355,10 @@ class RiskVisualizer:
         risk_dist = overview['risk_distribution']
         filtered_dist = {k: v for k, v in risk_dist.items() if v > 0}
         
-        colors = {'LOW': '#28a745', 'MEDIUM': '#ffc107', 'HIGH': '#fd7e14', 'CRITICAL': '#dc3545'}
-        chart_colors = [colors[label] for label in filtered_dist.keys()]
+        chart_colors = [CATEGORY_COLORS[label] for label in filtered_dist.keys()]
         
-        wedges, texts = ax2.pie(filtered_dist.values(), labels=filtered_dist.keys(), 
-                               colors=chart_colors, autopct='%1.0f%%', startangle=90)
+        wedges, texts, autotexts = ax2.pie(filtered_dist.values(), labels=filtered_dist.keys(), 
+                                          colors=chart_colors, autopct='%1.0f%%', startangle=90)
         ax2.set_title('Risk Distribution', fontweight='bold', fontsize=12)
         
         # 3. Top Risk Vessels (top-right)
@@ -339,8 +369,7 @@ class RiskVisualizer:
         scores = [v['risk_score'] for v in top_vessels]
         categories = [v['risk_category'] for v in top_vessels]
         
-        color_map = {'LOW': '#28a745', 'MEDIUM': '#ffc107', 'HIGH': '#fd7e14', 'CRITICAL': '#dc3545'}
-        bar_colors = [color_map[cat] for cat in categories]
+        bar_colors = [CATEGORY_COLORS[cat] for cat in categories]
         
         bars = ax3.barh(names, scores, color=bar_colors, alpha=0.8)
         ax3.set_title('Top 5 Risk Vessels', fontweight='bold', fontsize=12)
@@ -353,27 +382,21 @@ class RiskVisualizer:
             risk_matrix = self.report_data['risk_matrix']
             matrix_data = np.array(risk_matrix['matrix'])
             
-            im = ax4.imshow(matrix_data, cmap='RdYlGn_r', aspect='equal')
-            ax4.set_xticks(np.arange(5))
-            ax4.set_yticks(np.arange(5))
-            ax4.set_xticklabels(risk_matrix['probability_levels'], fontsize=10)
-            ax4.set_yticklabels(risk_matrix['severity_levels'], fontsize=10)
+            # Annotate occupied cells only
+            annot = np.where(matrix_data > 0, matrix_data.astype(int).astype(str), '')
+            sns.heatmap(matrix_data, annot=annot, fmt='', cmap='RdYlGn_r', square=True, cbar=False, ax=ax4,
+                        xticklabels=risk_matrix['probability_levels'], yticklabels=risk_matrix['severity_levels'],
+                        annot_kws={'fontweight': 'bold'}, rasterized=True)
+            plt.setp(ax4.get_xticklabels(), fontsize=10, rotation=0)
+            plt.setp(ax4.get_yticklabels(), fontsize=10, rotation=0)
             ax4.set_title('Risk Matrix (5×5)', fontweight='bold', fontsize=12)
             ax4.set_xlabel('Probability →')
             ax4.set_ylabel('← Severity')
-            
-            # Add vessel count annotations
-            for i in range(5):
-                for j in range(5):
-                    vessel_count = int(matrix_data[i, j])
-                    if vessel_count > 0:
-                        ax4.text(j, i, str(vessel_count), ha="center", va="center", 
-                                color='white', fontweight='bold')
         
         # 5. Age Distribution (middle-right)
         ax5 = fig.add_subplot(gs[1, 2])
-        vessels = self.report_data['vessel_details']
-        ages = [v['vessel_info']['age_years'] for v in vessels]
+        df = self._vessels_df
+        ages = df['age_years'].to_numpy()
         
         ax5.hist(ages, bins=8, color='#4ecdc4', alpha=0.7, edgecolor='black')
         ax5.set_title('Fleet Age Distribution', fontweight='bold', fontsize=12)
@@ -383,10 +406,10 @@ class RiskVisualizer:
         # 6. Risk Factors Summary (bottom, span all cols)
         ax6 = fig.add_subplot(gs[2, :])
         
-        vessel_names = [v['vessel_name'] for v in vessels]
-        age_factors = [v['factor_breakdown']['age_factor'] for v in vessels]
-        history_factors = [v['factor_breakdown']['history_factor'] for v in vessels]
-        mou_factors = [v['factor_breakdown']['mou_factor'] for v in vessels]
+        vessel_names = df['vessel_name'].tolist()
+        age_factors = df['age_factor'].to_numpy()
+        history_factors = df['history_factor'].to_numpy()
+        mou_factors = df['mou_factor'].to_numpy()
         
         x = np.arange(len(vessel_names))
         width = 0.25
@@ -410,8 +433,9 @@ class RiskVisualizer:
                     datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 
                     fontsize=20, fontweight='bold', y=0.98)
         
-        plt.savefig(save_path, dpi=300, bbox_inches='tight', facecolor='white')
-        plt.close()
+        # The dashboard is the chart viewed at full size: at least 150 dpi, print quality at 20x16 inches
+        plt.savefig(save_path, dpi=max(self.dpi, 150), bbox_inches='tight', facecolor='white')
+        self._close_figure()
         
         print(f"SUCCESS: Comprehensive dashboard saved as {save_path}")
         
@@ -421,6 +445,7 @@ class RiskVisualizer:
         print("=" * 60)
         
         try:
+            self._fig = plt.figure()
             self.create_risk_distribution_chart()
             self.create_risk_matrix_heatmap()
             self.create_vessel_risk_comparison()
@@ -439,6 +464,11 @@ class RiskVisualizer:
             
         except Exception as e:
             print(f"ERROR: Failed to generate visualizations: {str(e)}")
+            
+        finally:
+            if self._fig is not None:
+                plt.close(self._fig)
+                self._fig = None
 
 def main():
     """Main execution function."""